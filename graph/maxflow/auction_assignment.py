@@ -0,0 +1,190 @@
+# python3
+
+import sys
+from array import array
+import numpy as np
+from bipartite_matching import BipartiteMatching
+
+class AuctionAssignment:
+    """Minimum cost assignment of n jobs to m workers (n <= m) by the
+    epsilon-scaling auction algorithm
+
+    Jobs bid for workers: every unassigned job bids for its best worker
+    (largest benefit, the negated cost, minus price) and raises its price
+    by the margin over its second best worker plus eps. Each worker goes to
+    its highest bidder, whose previous holder becomes unassigned. All
+    unassigned jobs bid in the same round, so a round is a few NumPy
+    operations over the arrays of prices and benefits. Each phase ends when
+    every job is assigned; the next one starts from the same prices with
+    eps divided by eps_factor, down to eps = 1 on benefits multiplied by
+    m+1, which makes the assignment optimal for integer costs (within
+    1/(m+1) per job otherwise). Extra workers are absorbed by dummy jobs of
+    benefit 0 for all of them.
+
+    Attributes:
+        eps_factor      Reduction of eps between phases
+        rounds          Bidding rounds of the last solve
+    """
+    def __init__(self, eps_factor=5):
+        self.eps_factor = eps_factor
+        self.rounds = 0
+
+    def solve_dense(self, cost):
+        """Assignment for an n x m matrix of costs (every job can go to
+        every worker). Returns the worker of every job and the total cost"""
+        cost = np.asarray(cost, dtype=np.float64)
+        n, m = cost.shape
+        if n > m:
+            raise ValueError("more jobs (%d) than workers (%d)" % (n, m))
+        benefit = np.zeros((m, m))
+        benefit[:n] = -cost * (m + 1)
+
+        def bid(persons, prices, eps):
+            values = benefit[persons] - prices
+            rows = np.arange(len(persons))
+            best = values.argmax(axis=1)
+            first = values[rows, best]
+            if m == 1:
+                second = first
+            else:
+                values[rows, best] = -np.inf
+                second = values.max(axis=1)
+            return best, prices[best] + first - second + eps
+
+        owner = self.auction(m, bid, np.abs(benefit).max())
+        assignment = self.assignment_of(owner, n)
+        return assignment, cost[np.arange(n), assignment].sum()
+
+    def solve_sparse(self, n, m, edges):
+        """Assignment where job i can only go to the workers j of its
+        (i, j, cost) edges (0-based). Returns the worker of every job and the
+        total cost; raises ValueError if not every job can be assigned"""
+        edges = np.asarray(edges, dtype=np.float64).reshape(-1, 3)
+        left = edges[:, 0].astype(np.int64)
+        right = edges[:, 1].astype(np.int64)
+        cost = edges[:, 2]
+        if n > m:
+            raise ValueError("more jobs (%d) than workers (%d)" % (n, m))
+        matcher = BipartiteMatching()
+        first, adj = matcher.csr_adjacency(n, array('i', left.tolist()),
+                                           array('i', right.tolist()))
+        matching = matcher.hopcroft_karp(n, m, first, adj)
+        if -1 in matching:
+            raise ValueError("jobs cannot all be assigned")
+        # CSR adjacency of the jobs, then of the dummy jobs (all workers)
+        dummies = m - n
+        order = np.argsort(left, kind='stable')
+        head = np.concatenate([right[order], np.tile(np.arange(m), dummies)])
+        benefit = np.concatenate([-cost[order] * (m + 1), np.zeros(dummies * m)])
+        degree = np.concatenate([np.bincount(left, minlength=n),
+                                 np.full(dummies, m, dtype=np.int64)])
+        first = np.zeros(m + 1, dtype=np.int64)
+        np.cumsum(degree, out=first[1:])
+
+        def bid(persons, prices, eps):
+            # Edges of the bidders, one segment per bidder
+            start = first[persons]
+            length = first[persons + 1] - start
+            segment = np.cumsum(length) - length
+            edge = np.repeat(start - segment, length) + np.arange(length.sum())
+            bidder = np.repeat(np.arange(len(persons)), length)
+            values = benefit[edge] - prices[head[edge]]
+            best_value = np.maximum.reduceat(values, segment)
+            # The first edge of each segment that reaches its maximum
+            candidates = np.flatnonzero(values == best_value[bidder])
+            best = candidates[np.r_[True, bidder[candidates[1:]]
+                                    != bidder[candidates[:-1]]]]
+            values[best] = -np.inf
+            second = np.maximum.reduceat(values, segment)
+            # A job with a single worker only needs to outbid by eps
+            second = np.where(np.isinf(second), best_value, second)
+            objects = head[edge[best]]
+            return objects, prices[objects] + best_value - second + eps
+
+        owner = self.auction(m, bid, np.abs(benefit).max(initial=0))
+        assignment = self.assignment_of(owner, n)
+        # The cheapest edge of each job to its worker (edges may repeat)
+        chosen = right == np.asarray(assignment)[left]
+        cheapest = np.full(n, np.inf)
+        np.minimum.at(cheapest, left[chosen], cost[chosen])
+        return assignment, cheapest.sum()
+
+    def auction(self, m, bid, max_benefit):
+        """Epsilon-scaling auction of m objects among m persons, where
+        bid(persons, prices, eps) returns the object each person bids for
+        and its bid. Returns the person owning every object"""
+        prices = np.zeros(m)
+        eps = max(1.0, max_benefit / 2)
+        self.rounds = 0
+        while True:
+            owner = np.full(m, -1, dtype=np.int64)
+            object_of = np.full(m, -1, dtype=np.int64)
+            persons = np.arange(m)
+            while len(persons):
+                self.rounds += 1
+                objects, bids = bid(persons, prices, eps)
+                # Highest bid for every object: sort by object, then bid
+                order = np.lexsort((bids, objects))
+                objects = objects[order]
+                last = np.r_[objects[1:] != objects[:-1], True]
+                winners = persons[order][last]
+                objects = objects[last]
+                previous = owner[objects]
+                object_of[previous[previous >= 0]] = -1
+                owner[objects] = winners
+                object_of[winners] = objects
+                prices[objects] = bids[order][last]
+                persons = np.flatnonzero(object_of == -1)
+            if eps == 1.0:
+                return owner
+            eps = max(1.0, eps / self.eps_factor)
+
+    @staticmethod
+    def assignment_of(owner, n):
+        """Worker of each of the n real jobs given the owner of each worker"""
+        assignment = np.full(n, -1, dtype=np.int64)
+        real = owner < n
+        assignment[owner[real]] = np.flatnonzero(real)
+        return assignment.tolist()
+
+def read_data(sparse):
+    """Get user input
+    Format (dense):
+    Line 0: n m
+    Line 1: c11 c12 ... c1m
+    ...
+    Line n: cn1 cn2 ... cnm
+    Format (sparse):
+    Line 0: n m k
+    Line 1: i1 j1 c1
+    ...
+    Line k: ik jk ck
+
+    n:     Number of jobs
+    m:     Number of workers (n <= m)
+    c:     Cost of giving job i to worker j
+    1 <= i <= n, 1 <= j <= m  (1-based indices)
+    """
+    data = sys.stdin.read().split()
+    if not sparse:
+        n, m = int(data[0]), int(data[1])
+        return n, m, np.array(data[2:2+n*m], dtype=np.float64).reshape(n, m)
+    n, m, k = int(data[0]), int(data[1]), int(data[2])
+    edges = np.array(data[3:3+3*k], dtype=np.float64).reshape(k, 3)
+    edges[:, :2] -= 1
+    return n, m, edges
+
+if __name__ == '__main__':
+    # Usage: python3 auction_assignment.py [--sparse] < input
+    # Output: the worker of every job (1-based), then the total cost
+    sparse = '--sparse' in sys.argv
+    n, m, data = read_data(sparse)
+    solver = AuctionAssignment()
+    if sparse:
+        assignment, total = solver.solve_sparse(n, m, data)
+    else:
+        assignment, total = solver.solve_dense(data)
+    print(' '.join(str(j + 1) for j in assignment))
+    total = float(total)
+    # Integer costs are printed exactly, whatever their magnitude
+    print(int(total) if total.is_integer() else repr(total))
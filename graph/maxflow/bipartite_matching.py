@@ -1,110 +1,19 @@
 # python3
 
-import queue
+import sys
+from array import array
+from collections import deque
+from maxflow import FlowGraph
 
-class Edge:
-    """Edge of graph
-
-    Attributes:
-        start           directed edge from start to end
-        end             
-        capacity        capacity
-        flow            flow
-    """
-    def __init__(self, start, end, capacity):
-        self.start = start
-        self.end = end
-        self.capacity = capacity
-        self.flow = 0
-
-class FlowGraph:
-    """Max-flow graph
+class BipartiteMatching:
+    """Bipartite matching using max-flow algorithm
 
     Attributes:
-        edges           List of Edge instances
-                        Note: edges[u] and edges[v], where u is even, are a pair of
-                        entries to represent an edge and its reverse edge. The reverse
-                        edge only exists in the residual graph.
-        graph           Adjacency list representation
-        fast_find       Dictionary to find (u, v) in graph[u]
+        initial_size    Size of the initial matching found by the warm start
+                        heuristic of the last find_matching() or
+                        hopcroft_karp() call (0 without warm start)
     """
-    def __init__(self, n):
-        self.edges = []
-        self.graph = [[] for _ in range(n)]
-        self.fast_find = {}
-    def add_edge(self, from_, to, capacity):
-        """Add a new edge to graph"""
-        forward_edge = Edge(from_, to, capacity)
-        backward_edge = Edge(to, from_, 0)
-        self.fast_find[(from_,to)] = len(self.graph[from_])
-        self.graph[from_].append(len(self.edges))
-        self.edges.append(forward_edge)
-        self.fast_find[(to,from_)] = len(self.graph[to])
-        self.graph[to].append(len(self.edges))
-        self.edges.append(backward_edge)
-    def size(self):
-        """Number of nodes in graph"""
-        return len(self.graph)
-    def add_flow(self, id_, flow):
-        """Update flow of edge"""
-        # id_ and id_ ^ 1 form a pair of forward and reverse edge
-        self.edges[id_].flow += flow
-        self.edges[id_ ^ 1].flow -= flow
-    def max_flow(self, from_, to):
-        """Implementation of Edmonds-Karp algorithm"""
-        flow = 0
-        while True:
-            previous = [None]*self.size()
-            previous[from_] = from_
-            # Use breadth-first search
-            q = queue.Queue()
-            q.put(from_)
-            while not q.empty():
-                # No need for further search if sink is reached
-                if previous[to] != None:
-                    break
-                cur = q.get()
-                ids = self.graph[cur]
-                for i in ids:
-                    edge = self.edges[i]
-                    # Forward edge
-                    if i % 2 == 0:
-                        if previous[edge.end] == None and edge.capacity > edge.flow:
-                            previous[edge.end] = cur
-                            q.put(edge.end)
-                    # Reverse edge (in residual graph)
-                    else:
-                        if previous[edge.end] == None and edge.flow != 0:
-                            previous[edge.end] = cur
-                            q.put(edge.end)
-            # Update flow if there is an augmenting path in residual graph
-            if previous[to] != None:
-                # Find the minimum capacity along this path
-                cur = to
-                min_ = float('inf')
-                while previous[cur] != cur:
-                    id_ = self.graph[previous[cur]][self.fast_find[(previous[cur], cur)]]
-                    edge = self.edges[id_]
-                    # Forward edge
-                    if id_ % 2 == 0:
-                        min_ = min(min_, edge.capacity - edge.flow)
-                    # Reverse edge (in residual graph)
-                    else:
-                        min_ = min(min_, -edge.flow)
-                    cur = previous[cur]
-                # Update all edges along this path
-                cur = to
-                while previous[cur] != cur:
-                    id_ = self.graph[previous[cur]][self.fast_find[(previous[cur], cur)]]
-                    self.add_flow(id_, min_)
-                    cur = previous[cur]
-                flow += min_
-            # Otherwise, return the maximum flow
-            else:
-                return flow
-
-class BipartiteMatching:
-    """Bipartite matching using max-flow algorithm"""
+    initial_size = 0
     def read_data(self):
         """Read input
         Format:
@@ -117,38 +26,261 @@ class BipartiteMatching:
         n, m = map(int, input().split())
         adj_matrix = [list(map(int, input().split())) for i in range(n)]
         return adj_matrix
+    def read_sparse(self, lines=sys.stdin):
+        """Read sparse input line by line, without any matrix
+        Format:
+        Line 0: n m k
+        Line 1: i1 j1
+        Line 2: i2 j2
+        ...
+        Line k: ik jk
+        1 <= i <= n, 1 <= j <= m  (edge between left node i and right node j)
+
+        Returns n, m and the CSR adjacency of the left nodes
+        """
+        lines = iter(lines)
+        n, m, k = map(int, next(lines).split())
+        left = array('i')
+        right = array('i')
+        for _ in range(k):
+            i, j = next(lines).split()
+            left.append(int(i) - 1)
+            right.append(int(j) - 1)
+        return (n, m) + self.csr_adjacency(n, left, right)
+    @staticmethod
+    def csr_adjacency(n, left, right):
+        """Pack edges (left[k], right[k]) into CSR form: the right nodes
+        adjacent to left node i are adj[first[i]:first[i+1]]"""
+        first = array('q', [0])*(n+1)
+        for i in left:
+            first[i+1] += 1
+        for i in range(n):
+            first[i+1] += first[i]
+        pos = first[:n]
+        adj = array('i', [0])*len(left)
+        for i, j in zip(left, right):
+            adj[pos[i]] = j
+            pos[i] += 1
+        return first, adj
     def write_response(self, matching):
         """Output matching"""
         line = [str(-1 if x == -1 else x + 1) for x in matching]
         print(' '.join(line))
-    def find_matching(self, adj_matrix):
-        """Use class FlowGraph (Edmonds-Karp algorithm) to find max matching"""
+    def find_matching(self, adj_matrix, warm_start=None):
+        """Use class FlowGraph (Edmonds-Karp algorithm) to find max matching
+
+        warm_start names a heuristic of WARM_STARTS whose matching is put in
+        as initial flow, so that augmenting paths are only searched for the
+        nodes it left unmatched"""
         n = len(adj_matrix)
         m = len(adj_matrix[0])
         matching = [-1] * n # -1 means no match
         graph = FlowGraph(n+m+2) # +2 for artificial source and sink
+        source_edges = [graph.add_edge(n+m, i, 1) for i in range(n)] # add edges from source
+        edge_ids = [] # edge_ids[i][j]: edge from i to n+j
         for i in range(n):
-            graph.add_edge(n+m, i, 1) # add edges from source
+            ids = {}
             for j in range(m):
                 if adj_matrix[i][j] == 1:
-                    graph.add_edge(i, n+j, 1) # add edges from input matrix
-        for j in range(m):
-            graph.add_edge(n+j, n+m+1, 1) # add edges to sink
+                    ids[j] = graph.add_edge(i, n+j, 1) # add edges from input matrix
+            edge_ids.append(ids)
+        sink_edges = [graph.add_edge(n+j, n+m+1, 1) for j in range(m)] # add edges to sink
+        self.initial_size = 0
+        if warm_start is not None:
+            left = array('i', [i for i in range(n) for j in edge_ids[i]])
+            right = array('i', [j for i in range(n) for j in edge_ids[i]])
+            first, adj = self.csr_adjacency(n, left, right)
+            initial = WARM_STARTS[warm_start](self, n, m, first, adj)
+            for i, j in enumerate(initial):
+                if j != -1:
+                    graph.add_flow(source_edges[i], 1)
+                    graph.add_flow(edge_ids[i][j], 1)
+                    graph.add_flow(sink_edges[j], 1)
+                    self.initial_size += 1
         max_flow = graph.max_flow(n+m, n+m+1)
         # Find which nodes in left part has flow to nodes in right part
         for i in range(n):
-            ids = graph.graph[i]
-            for edge_id in ids:
-                edge = graph.edges[edge_id]
-                if edge.flow == 1:
-                    matching[i] = edge.end-n
+            for edge_id in graph.edges_from(i):
+                if graph.flow[edge_id] == 1:
+                    matching[i] = graph.head[edge_id]-n
         return matching
+    def greedy_matching(self, n, m, first, adj):
+        """Match every left node, in order, to its first free neighbour.
+        Returns the right node matched to every left node (-1 if unmatched);
+        the matching is maximal and has at least half the maximum size"""
+        match_left = array('i', [-1])*n
+        matched = bytearray(m)
+        for u in range(n):
+            for k in range(first[u], first[u+1]):
+                v = adj[k]
+                if not matched[v]:
+                    matched[v] = 1
+                    match_left[u] = v
+                    break
+        return match_left
+    def karp_sipser_matching(self, n, m, first, adj):
+        """Karp-Sipser heuristic: as long as some free node has a single free
+        neighbour, match the two (a maximum matching always can); otherwise
+        match a free left node to its first free neighbour as in
+        greedy_matching. Degrees count free neighbours only and are updated
+        as nodes get matched. Returns the right node matched to every left
+        node (-1 if unmatched)"""
+        # Adjacency of the right nodes (CSR) and degrees of both sides,
+        # nodes of the right side numbered from n
+        left = array('i', [u for u in range(n) for _ in range(first[u], first[u+1])])
+        firstR, adjR = self.csr_adjacency(m, adj, left)
+        degree = array('i', [first[u+1] - first[u] for u in range(n)]
+                       + [firstR[v+1] - firstR[v] for v in range(m)])
+        mate = array('i', [-1])*(n+m)
+        ones = [u for u in range(n+m) if degree[u] == 1]
+        def neighbours(u):
+            if u < n:
+                return (n + v for v in adj[first[u]:first[u+1]])
+            return iter(adjR[firstR[u-n]:firstR[u-n+1]])
+        def match(u, v):
+            mate[u] = v
+            mate[v] = u
+            for x in (u, v):
+                for w in neighbours(x):
+                    if mate[w] == -1:
+                        degree[w] -= 1
+                        if degree[w] == 1:
+                            ones.append(w)
+        next_left = 0
+        while True:
+            while ones:
+                u = ones.pop()
+                if mate[u] != -1 or degree[u] != 1:
+                    continue
+                for w in neighbours(u):
+                    if mate[w] == -1:
+                        match(u, w)
+                        break
+            # No degree-1 node left: one greedy step
+            while next_left < n and (mate[next_left] != -1 or degree[next_left] == 0):
+                next_left += 1
+            if next_left == n:
+                break
+            u = next_left
+            for w in neighbours(u):
+                if mate[w] == -1:
+                    match(u, w)
+                    break
+        return array('i', [-1 if v == -1 else v - n for v in mate[:n]])
+    def hopcroft_karp(self, n, m, first, adj, warm_start=None):
+        """Hopcroft-Karp algorithm on the CSR adjacency of the left nodes,
+        O(E sqrt(V))
+
+        Each phase finds, by BFS from the free left nodes, the length of the
+        shortest augmenting paths, then augments along a maximal set of
+        disjoint shortest paths by DFS in the layered graph. warm_start names
+        a heuristic of WARM_STARTS whose matching the phases start from.
+        Returns the right node matched to every left node (-1 if unmatched)."""
+        match_right = array('i', [-1])*m
+        if warm_start is None:
+            match_left = array('i', [-1])*n
+        else:
+            match_left = array('i', WARM_STARTS[warm_start](self, n, m, first, adj))
+            for u in range(n):
+                if match_left[u] != -1:
+                    match_right[match_left[u]] = u
+        self.initial_size = n - match_left.count(-1)
+        while True:
+            # Layers of left nodes by alternating path length from a free one
+            dist = array('i', [-1])*n
+            q = deque()
+            for u in range(n):
+                if match_left[u] == -1:
+                    dist[u] = 0
+                    q.append(u)
+            limit = -1  # layer of the first free right node found
+            while q:
+                u = q.popleft()
+                if limit != -1 and dist[u] > limit:
+                    break
+                for k in range(first[u], first[u+1]):
+                    w = match_right[adj[k]]
+                    if w == -1:
+                        if limit == -1:
+                            limit = dist[u]
+                    elif dist[w] == -1:
+                        dist[w] = dist[u] + 1
+                        q.append(w)
+            if limit == -1:
+                return list(match_left)
+            # Disjoint shortest augmenting paths, with one current edge
+            # pointer per left node as in Dinic's algorithm
+            current = first[:n]
+            for root in range(n):
+                if match_left[root] != -1 or dist[root] != 0:
+                    continue
+                stack = [root]
+                while stack:
+                    u = stack[-1]
+                    end = first[u+1]
+                    k = current[u]
+                    while k < end:
+                        v = adj[k]
+                        w = match_right[v]
+                        if w == -1 and dist[u] == limit:
+                            break
+                        if w != -1 and dist[w] == dist[u] + 1:
+                            break
+                        k += 1
+                    current[u] = k
+                    if k == end:
+                        # Dead end: drop u from the layered graph
+                        dist[u] = -1
+                        stack.pop()
+                        if stack:
+                            current[stack[-1]] += 1
+                    elif w == -1:
+                        # Augment: every left node of the path takes the
+                        # right node its current edge leads to
+                        for x in stack:
+                            v = adj[current[x]]
+                            match_left[x] = v
+                            match_right[v] = x
+                        stack = []
+                    else:
+                        stack.append(w)
+    def find_matching_sparse(self, n, m, edges):
+        """Max matching of n left and m right nodes given a list of
+        (left, right) edges (0-based), by Hopcroft-Karp"""
+        left = array('i', [i for i, _ in edges])
+        right = array('i', [j for _, j in edges])
+        return self.hopcroft_karp(n, m, *self.csr_adjacency(n, left, right))
     def solve(self):
         """ Read bipartite graph from input, find max matching and print output"""
         adj_matrix = self.read_data()
         matching = self.find_matching(adj_matrix)
         self.write_response(matching)
 
+# Initial matching heuristics by name
+WARM_STARTS = {
+    'greedy': BipartiteMatching.greedy_matching,
+    'karp_sipser': BipartiteMatching.karp_sipser_matching,
+}
+
 if __name__ == '__main__':
+    # Usage: python3 bipartite_matching.py [--sparse] [--warm heuristic] < input
+    #     --sparse reads the edge list format of read_sparse() and matches
+    #     with Hopcroft-Karp
+    #     --warm starts from the matching of greedy or karp_sipser, and
+    #     writes the share of the matching it found to stderr
     bipartite_matching = BipartiteMatching()
-    bipartite_matching.solve()
+    warm_start = None
+    if '--warm' in sys.argv:
+        warm_start = sys.argv[sys.argv.index('--warm') + 1]
+    if '--sparse' in sys.argv:
+        n, m, first, adj = bipartite_matching.read_sparse()
+        matching = bipartite_matching.hopcroft_karp(n, m, first, adj, warm_start)
+    else:
+        matching = bipartite_matching.find_matching(bipartite_matching.read_data(),
+                                                    warm_start)
+    bipartite_matching.write_response(matching)
+    if warm_start is not None:
+        size = sum(1 for x in matching if x != -1)
+        print("%s: %d of %d matched (%.1f%%)" % (
+            warm_start, bipartite_matching.initial_size, size,
+            100.0 * bipartite_matching.initial_size / max(1, size)), file=sys.stderr)
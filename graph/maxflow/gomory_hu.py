@@ -0,0 +1,152 @@
+# python3
+
+import sys
+from array import array
+from maxflow import FlowGraph
+
+class GomoryHuTree:
+    """Gomory-Hu tree of an undirected graph, built by Gusfield's algorithm
+
+    The minimum cut between any two nodes s and t of the graph equals the
+    smallest weight on the path from s to t in the tree. The tree is built
+    with n-1 max-flows on the same FlowGraph (flows are reset in between):
+    node s is cut from its current tree parent, and the nodes after s on
+    s's side of the cut that hang from the same parent are moved under s.
+    Path minima are then answered in O(log n) by binary lifting.
+
+    Attributes:
+        n            Number of nodes
+        parent       Tree parent of each node (parent[v] < v; node 0 is
+                     the root and its own parent)
+        weight       weight[v] is the minimum cut between v and parent[v]
+        depth        Depth of each node in the tree
+        up           up[k][v] is the ancestor 2^k levels above v (the root
+                     if there is none)
+        low          low[k][v] is the smallest weight on the 2^k edges
+                     above v
+    """
+    def __init__(self, graph, algorithm='push_relabel', **options):
+        """Build the tree of graph, an undirected FlowGraph (see
+        undirected_graph()), using the given max-flow algorithm of maxflow.py
+        with its options"""
+        n = graph.size()
+        self.n = n
+        parent = array('i', [0])*n
+        weight = array('q', [0])*n
+        if algorithm == 'push_relabel':
+            # Only the cut is needed, not the flow
+            options.setdefault('min_cut', True)
+        for s in range(1, n):
+            t = parent[s]
+            graph.reset_flow()
+            weight[s] = graph.max_flow(s, t, algorithm, **options)
+            # Nodes that cannot reach t in the residual graph are on s's side
+            # of a minimum cut (this also holds for the preflow of min_cut)
+            height = graph.residual_heights(t, s)
+            for v in range(s+1, n):
+                if parent[v] == t and height[v] == n:
+                    parent[v] = s
+        self.parent = parent
+        self.weight = weight
+        self.build_index()
+
+    def build_index(self):
+        """Binary lifting tables for path minimum queries"""
+        n = self.n
+        parent = self.parent
+        depth = array('i', [0])*n
+        # Parents come before their children
+        for v in range(1, n):
+            depth[v] = depth[parent[v]] + 1
+        up = [parent]
+        low = [array('q', self.weight)]
+        # The root has no edge above it
+        low[0][0] = max(self.weight) + 1
+        for k in range(1, max(depth).bit_length()):
+            prev_up = up[-1]
+            prev_low = low[-1]
+            up.append(array('i', [prev_up[prev_up[v]] for v in range(n)]))
+            low.append(array('q', [min(prev_low[v], prev_low[prev_up[v]])
+                                   for v in range(n)]))
+        self.depth = depth
+        self.up = up
+        self.low = low
+
+    def min_cut(self, s, t):
+        """Value of a minimum cut between nodes s and t (s != t)"""
+        depth = self.depth
+        up = self.up
+        low = self.low
+        # The weight of the root, larger than any cut
+        result = low[0][0]
+        if depth[s] < depth[t]:
+            s, t = t, s
+        # Lift s to the depth of t
+        diff = depth[s] - depth[t]
+        k = 0
+        while diff:
+            if diff & 1:
+                result = min(result, low[k][s])
+                s = up[k][s]
+            diff >>= 1
+            k += 1
+        if s == t:
+            return result
+        # Lift both to just below their lowest common ancestor
+        for k in range(len(up) - 1, -1, -1):
+            if up[k][s] != up[k][t]:
+                result = min(result, low[k][s], low[k][t])
+                s = up[k][s]
+                t = up[k][t]
+        return min(result, low[0][s], low[0][t])
+
+def undirected_graph(n, edges):
+    """FlowGraph of n nodes with an undirected edge of capacity c for each
+    (u, v, c) of edges: the reverse edge gets capacity c as well"""
+    graph = FlowGraph(n)
+    for u, v, c in edges:
+        if u != v:
+            id_ = graph.add_edge(u, v, c)
+            graph.capacity[id_ ^ 1] = c
+    return graph
+
+def read_data():
+    """Get user input
+    Format:
+    Line 0: n m
+    Line 1: u1 v1 c1
+    ...
+    Line m: um vm cm
+    Line m+1: q
+    Line m+2: s1 t1
+    ...
+    Line m+q+1: sq tq
+
+    n:     Number of nodes
+    m:     Number of undirected edges
+    u, v:  Edge between node index u and node index v
+    c:     Edge capacity
+    q:     Number of queries
+    s, t:  Min cut query between s and t (s != t)
+    1 <= u,v,s,t <= n  (1-based indices)
+    """
+    n, m = map(int, input().split())
+    edges = []
+    for _ in range(m):
+        u, v, c = map(int, input().split())
+        edges.append((u - 1, v - 1, c))
+    q = int(input())
+    queries = []
+    for _ in range(q):
+        s, t = map(int, input().split())
+        queries.append((s - 1, t - 1))
+    return n, edges, queries
+
+if __name__ == '__main__':
+    # Usage: python3 gomory_hu.py [algorithm] < input
+    #     algorithm: push_relabel (default), dinic or edmonds_karp
+    # Output: the min cut value of every query
+    algorithm = sys.argv[1] if len(sys.argv) > 1 else 'push_relabel'
+    n, edges, queries = read_data()
+    tree = GomoryHuTree(undirected_graph(n, edges), algorithm)
+    print(" ".join(str(tree.min_cut(s, t)) for s, t in queries))
@@ -1,107 +1,391 @@
 # python3
 
-import queue
-
-class Edge:
-    """Edge of graph
-
-    Attributes:
-        start           directed edge from start to end
-        end             
-        capacity        capacity
-        flow            flow
-    """
-    def __init__(self, start, end, capacity):
-        self.start = start
-        self.end = end
-        self.capacity = capacity
-        self.flow = 0
+import sys
+from array import array
+from collections import deque
 
 class FlowGraph:
     """Max-flow graph
 
+    Edges are stored as parallel arrays indexed by edge id. Edges 2k and
+    2k+1 are a pair: an edge and its reverse edge, which only exists in the
+    residual graph (capacity 0). The reverse of edge id_ is id_ ^ 1, and the
+    residual capacity of any edge id_ is capacity[id_] - flow[id_].
+
     Attributes:
-        edges           List of Edge instances
-                        Note: edges[u] and edges[v], where u is even, are a pair of
-                        entries to represent an edge and its reverse edge. The reverse
-                        edge only exists in the residual graph.
-        graph           Adjacency list representation
-        fast_find       Dictionary to find (u, v) in graph[u]
+        n               Number of nodes
+        head            head[id_] is the node edge id_ points to; its tail
+                        is head[id_ ^ 1]
+        capacity        Capacity of each edge
+        flow            Flow of each edge (flow[id_ ^ 1] == -flow[id_])
+        first           CSR offsets: the edges leaving u are
+        last            adj[first[u]:last[u]] (built by build_csr()),
+        adj             followed by free slots up to first[u+1] for edges
+                        added later
+        spare           True once edges were added after build_csr(), so
+                        that the next build leaves free slots
+        previous        Edge used to reach each node, kept by augment()
+                        between calls (all -1)
     """
     def __init__(self, n):
-        self.edges = []
-        self.graph = [[] for _ in range(n)]
-        self.fast_find = {}
+        self.n = n
+        self.head = array('i')
+        self.capacity = array('q')
+        self.flow = array('q')
+        self.first = None
+        self.last = None
+        self.adj = None
+        self.spare = False
+        self.previous = None
     def add_edge(self, from_, to, capacity):
-        """Add a new edge to graph"""
-        forward_edge = Edge(from_, to, capacity)
-        backward_edge = Edge(to, from_, 0)
-        self.fast_find[(from_,to)] = len(self.graph[from_])
-        self.graph[from_].append(len(self.edges))
-        self.edges.append(forward_edge)
-        self.fast_find[(to,from_)] = len(self.graph[to])
-        self.graph[to].append(len(self.edges))
-        self.edges.append(backward_edge)
+        """Add a new edge to graph and return its id (into free slots of
+        the adjacency once built, or rebuilt on next use, see README)"""
+        id_ = len(self.head)
+        self.head.append(to)
+        self.head.append(from_)
+        self.capacity.append(capacity)
+        self.capacity.append(0)
+        self.flow.append(0)
+        self.flow.append(0)
+        first = self.first
+        if first is not None:
+            last = self.last
+            if (first[from_+1] - last[from_] > (from_ == to)
+                    and last[to] < first[to+1]):
+                self.adj[last[from_]] = id_
+                last[from_] += 1
+                self.adj[last[to]] = id_ + 1
+                last[to] += 1
+            else:
+                # The adjacency is rebuilt on next use
+                self.first = None
+                self.spare = True
+        return id_
+    def build_csr(self):
+        """Sort edge ids by tail into the CSR adjacency (counting sort)
+
+        With spare, every node gets 2 + 1/4 of its edges as free slots."""
+        n = self.n
+        head = self.head
+        count = array('q', [0])*n
+        for id_ in range(len(head)):
+            count[head[id_ ^ 1]] += 1
+        first = array('q', [0])*(n+1)
+        for u in range(n):
+            room = count[u] + (2 + count[u] // 4 if self.spare else 0)
+            first[u+1] = first[u] + room
+        last = first[:n]
+        adj = array('i', [-1])*first[n]
+        for id_ in range(len(head)):
+            u = head[id_ ^ 1]
+            adj[last[u]] = id_
+            last[u] += 1
+        self.first = first
+        self.last = last
+        self.adj = adj
+    def edges_from(self, u):
+        """Ids of the edges leaving u (including reverse edges)"""
+        if self.first is None:
+            self.build_csr()
+        return self.adj[self.first[u]:self.last[u]]
     def size(self):
         """Number of nodes in graph"""
-        return len(self.graph)
+        return self.n
     def add_flow(self, id_, flow):
         """Update flow of edge"""
         # id_ and id_ ^ 1 form a pair of forward and reverse edge
-        self.edges[id_].flow += flow
-        self.edges[id_ ^ 1].flow -= flow
-    def max_flow(self, from_, to):
+        self.flow[id_] += flow
+        self.flow[id_ ^ 1] -= flow
+    def max_flow(self, from_, to, algorithm='edmonds_karp', **options):
+        """Flow added to the current flow from from_ to to to make it
+        maximum, by the given algorithm (a key of ALGORITHMS) with options"""
+        if self.first is None:
+            self.build_csr()
+        return ALGORITHMS[algorithm](self, from_, to, **options)
+    def reset_flow(self):
+        """Remove all flow, e.g. before a max-flow between other nodes"""
+        self.flow = array('q', [0])*len(self.head)
+    def flow_value(self, from_):
+        """Net flow out of from_ (the flow value if from_ is the source)"""
+        return sum(self.flow[i] for i in self.edges_from(from_))
+    def set_capacity(self, id_, capacity, from_, to):
+        """Change the capacity of edge id_, rerouting any surplus so that the
+        flow from from_ to to stays valid, and return the change of the flow
+        value (call max_flow() again to make it maximum)"""
+        self.capacity[id_] = capacity
+        over = self.flow[id_] - capacity
+        if over <= 0:
+            return 0
+        if self.first is None:
+            self.build_csr()
+        before = self.flow_value(from_)
+        u = self.head[id_ ^ 1]
+        v = self.head[id_]
+        self.add_flow(id_, -over)
+        over -= self.augment(u, v, over)
+        if over > 0:
+            # Nodes other than from_ and to must not keep excess or deficit
+            if u != from_ and u != to:
+                self.augment(u, from_, over)
+            if v != from_ and v != to:
+                self.augment(to, v, over)
+        return self.flow_value(from_) - before
+    def augment(self, from_, to, limit=None):
+        """Push flow from from_ to to along shortest paths of the residual
+        graph, up to limit units (no limit if None), and return the amount
+        pushed"""
+        n = self.n
+        head = self.head
+        capacity = self.capacity
+        flow_ = self.flow
+        first = self.first
+        last = self.last
+        adj = self.adj
+        # Allocated once: each search only resets the nodes it reached, so
+        # a short reroute does not cost O(n)
+        previous = self.previous
+        if previous is None or len(previous) != n:
+            previous = array('i', [-1])*n
+            self.previous = previous
+        flow = 0
+        while limit is None or flow < limit:
+            # Use breadth-first search, recording the edge used to reach
+            # each node (-1 if not reached yet)
+            previous[from_] = -2
+            q = [from_]
+            k = 0
+            while k < len(q) and previous[to] == -1:
+                cur = q[k]
+                k += 1
+                for i in adj[first[cur]:last[cur]]:
+                    v = head[i]
+                    if previous[v] == -1 and capacity[i] > flow_[i]:
+                        previous[v] = i
+                        q.append(v)
+            # Otherwise, return the maximum flow
+            if previous[to] == -1:
+                for v in q:
+                    previous[v] = -1
+                return flow
+            # Find the minimum residual capacity along this path
+            min_ = None if limit is None else limit - flow
+            cur = to
+            while cur != from_:
+                i = previous[cur]
+                residual = capacity[i] - flow_[i]
+                if min_ is None or residual < min_:
+                    min_ = residual
+                cur = head[i ^ 1]
+            # Update all edges along this path
+            cur = to
+            while cur != from_:
+                i = previous[cur]
+                flow_[i] += min_
+                flow_[i ^ 1] -= min_
+                cur = head[i ^ 1]
+            flow += min_
+            for v in q:
+                previous[v] = -1
+        return flow
+    def edmonds_karp(self, from_, to):
         """Implementation of Edmonds-Karp algorithm"""
+        return self.augment(from_, to)
+    def levels(self, from_, to):
+        """Breadth-first search distances from from_ in the residual graph
+        (-1 if unreachable), stopping once to is reached"""
+        head = self.head
+        capacity = self.capacity
+        flow = self.flow
+        first = self.first
+        last = self.last
+        adj = self.adj
+        level = array('i', [-1])*self.n
+        level[from_] = 0
+        q = deque([from_])
+        while q and level[to] == -1:
+            cur = q.popleft()
+            for i in adj[first[cur]:last[cur]]:
+                v = head[i]
+                if level[v] == -1 and capacity[i] > flow[i]:
+                    level[v] = level[cur] + 1
+                    q.append(v)
+        return level
+    def dinic(self, from_, to):
+        """Implementation of Dinic's algorithm, O(V^2 E)
+
+        Each phase builds the level graph of the residual graph by BFS and
+        saturates it with a blocking flow: depth-first searches along edges
+        that go one level up, where each node keeps a pointer to its current
+        edge so that edges found useless are never scanned again in the
+        phase."""
+        head = self.head
+        capacity = self.capacity
+        flow_ = self.flow
+        first = self.first
+        last = self.last
+        adj = self.adj
         flow = 0
         while True:
-            previous = [None]*self.size()
-            previous[from_] = from_
-            # Use breadth-first search
-            q = queue.Queue()
-            q.put(from_)
-            while not q.empty():
-                # No need for further search if sink is reached
-                if previous[to] != None:
-                    break
-                cur = q.get()
-                ids = self.graph[cur]
-                for i in ids:
-                    edge = self.edges[i]
-                    # Forward edge
-                    if i % 2 == 0:
-                        if previous[edge.end] == None and edge.capacity > edge.flow:
-                            previous[edge.end] = cur
-                            q.put(edge.end)
-                    # Reverse edge (in residual graph)
-                    else:
-                        if previous[edge.end] == None and edge.flow != 0:
-                            previous[edge.end] = cur
-                            q.put(edge.end)
-            # Update flow if there is an augmenting path in residual graph
-            if previous[to] != None:
-                # Find the minimum capacity along this path
-                cur = to
-                min_ = float('inf')
-                while previous[cur] != cur:
-                    id_ = self.graph[previous[cur]][self.fast_find[(previous[cur], cur)]]
-                    edge = self.edges[id_]
-                    # Forward edge
-                    if id_ % 2 == 0:
-                        min_ = min(min_, edge.capacity - edge.flow)
-                    # Reverse edge (in residual graph)
-                    else:
-                        min_ = min(min_, -edge.flow)
-                    cur = previous[cur]
-                # Update all edges along this path
-                cur = to
-                while previous[cur] != cur:
-                    id_ = self.graph[previous[cur]][self.fast_find[(previous[cur], cur)]]
-                    self.add_flow(id_, min_)
-                    cur = previous[cur]
-                flow += min_
-            # Otherwise, return the maximum flow
-            else:
+            level = self.levels(from_, to)
+            if level[to] == -1:
                 return flow
+            current = first[:self.n]
+            path = []  # ids of the edges from from_ to cur
+            cur = from_
+            while True:
+                if cur == to:
+                    # Augment along the path, then start again from from_
+                    min_ = min(capacity[i] - flow_[i] for i in path)
+                    for i in path:
+                        flow_[i] += min_
+                        flow_[i ^ 1] -= min_
+                    flow += min_
+                    path = []
+                    cur = from_
+                    continue
+                end = last[cur]
+                next_level = level[cur] + 1
+                k = current[cur]
+                while k < end:
+                    i = adj[k]
+                    if capacity[i] > flow_[i] and level[head[i]] == next_level:
+                        break
+                    k += 1
+                current[cur] = k
+                if k < end:
+                    path.append(i)
+                    cur = head[i]
+                elif cur == from_:
+                    # No path left in the level graph: the phase is over
+                    break
+                else:
+                    # Dead end: retreat and skip the edge that led here
+                    cur = head[path.pop() ^ 1]
+                    current[cur] += 1
+    def residual_heights(self, sink, fixed):
+        """Exact push-relabel heights: breadth-first search distances to sink
+        in the residual graph. Nodes that cannot reach sink, and node fixed
+        (kept at the top), get height n"""
+        n = self.n
+        head = self.head
+        capacity = self.capacity
+        flow = self.flow
+        first = self.first
+        last = self.last
+        adj = self.adj
+        height = array('i', [n])*n
+        height[sink] = 0
+        q = deque([sink])
+        while q:
+            cur = q.popleft()
+            for i in adj[first[cur]:last[cur]]:
+                v = head[i]
+                # Edge i ^ 1 goes from v to cur
+                if height[v] == n and v != fixed and v != sink \
+                        and capacity[i ^ 1] > flow[i ^ 1]:
+                    height[v] = height[cur] + 1
+                    q.append(v)
+        return height
+    def discharge_all(self, sink, fixed, excess):
+        """Push the excess of every node toward sink, highest label first,
+        until no node below height n has excess. Returns nothing; flows and
+        excess are updated in place"""
+        n = self.n
+        head = self.head
+        capacity = self.capacity
+        flow = self.flow
+        first = self.first
+        last = self.last
+        adj = self.adj
+        # Global relabeling after about this much relabeling work
+        interval = 6*n + len(head) // 2
+        work = interval
+        while True:
+            if work >= interval:
+                # Global relabel: exact heights, and the active nodes rebuilt
+                work = 0
+                height = self.residual_heights(sink, fixed)
+                count = [0]*(n+1)
+                for h in height:
+                    count[h] += 1
+                active = [[] for _ in range(n)]
+                for v in range(n):
+                    if excess[v] > 0 and height[v] < n and v != sink and v != fixed:
+                        active[height[v]].append(v)
+                current = first[:n]
+                highest = n - 1
+            while highest >= 0 and not active[highest]:
+                highest -= 1
+            if highest < 0:
+                return
+            u = active[highest].pop()
+            if height[u] != highest:
+                # Lifted by a gap since it became active
+                continue
+            end = last[u]
+            hu = highest
+            while excess[u] > 0:
+                k = current[u]
+                if k == end:
+                    # Relabel: just above the lowest residual neighbour
+                    work += end - first[u] + 12
+                    new = n
+                    for i in adj[first[u]:end]:
+                        if capacity[i] > flow[i] and height[head[i]] < new:
+                            new = height[head[i]]
+                    new = min(new + 1, n)
+                    count[hu] -= 1
+                    if count[hu] == 0:
+                        # Gap: nothing above hu can reach sink any more
+                        for v in range(n):
+                            if hu < height[v] < n:
+                                count[height[v]] -= 1
+                                height[v] = n
+                        new = n
+                    height[u] = new
+                    count[new] += 1
+                    current[u] = first[u]
+                    hu = new
+                    if hu >= n:
+                        break
+                    continue
+                i = adj[k]
+                residual = capacity[i] - flow[i]
+                v = head[i]
+                if residual > 0 and hu == height[v] + 1:
+                    delta = min(excess[u], residual)
+                    flow[i] += delta
+                    flow[i ^ 1] -= delta
+                    excess[u] -= delta
+                    if excess[v] == 0 and v != sink:
+                        active[hu - 1].append(v)
+                        if hu - 1 > highest:
+                            highest = hu - 1
+                    excess[v] += delta
+                else:
+                    current[u] = k + 1
+    def push_relabel(self, from_, to, min_cut=False):
+        """Implementation of highest-label push-relabel, O(V^2 sqrt(E));
+        with min_cut, stop after phase one and return the sink's excess
+        (the flow added, see README)"""
+        excess = [0]*self.n
+        for i in self.edges_from(from_):
+            residual = self.capacity[i] - self.flow[i]
+            if residual > 0:
+                self.add_flow(i, residual)
+                excess[self.head[i]] += residual
+        self.discharge_all(to, from_, excess)
+        if min_cut:
+            return excess[to]
+        self.discharge_all(from_, to, excess)
+        return excess[to]
+
+# Max-flow algorithms of FlowGraph by name
+ALGORITHMS = {
+    'edmonds_karp': FlowGraph.edmonds_karp,
+    'dinic': FlowGraph.dinic,
+    'push_relabel': FlowGraph.push_relabel,
+}
 
 def read_data():
     """Get user input
@@ -140,5 +424,8 @@ def read_data():
     return graph
 
 if __name__ == '__main__':
+    # Usage: python3 maxflow.py [algorithm] < input
+    #     algorithm: edmonds_karp (default), dinic or push_relabel
+    algorithm = sys.argv[1] if len(sys.argv) > 1 else 'edmonds_karp'
     graph = read_data()
-    print(graph.max_flow(0, graph.size() - 1))
+    print(graph.max_flow(0, graph.size() - 1, algorithm))
@@ -0,0 +1,203 @@
+#Uses python3
+
+import heapq
+import random
+from array import array
+from bidirectional_coor_astar import Graph
+
+def one_to_all(first, head, weight, source):
+    """Dijkstra's algorithm from source over CSR arrays.
+
+    Returns the distance array (inf if unreachable) and the parent array
+    (-1 for the source and unreachable nodes) of the shortest path tree."""
+    n = len(first) - 1
+    inf = float('inf')
+    dist = array('d', [inf])*n
+    parent = array('i', [-1])*n
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for i in range(first[u], first[u+1]):
+            v = head[i]
+            new_dist = d + weight[i]
+            if new_dist < dist[v]:
+                dist[v] = new_dist
+                parent[v] = u
+                heapq.heappush(heap, (new_dist, v))
+    return dist, parent
+
+class Landmarks:
+    """ALT potentials (A*, landmarks and triangle inequality) for a Graph.
+
+    For every landmark L the distances d(L, v) and d(v, L) are precomputed.
+    By the triangle inequality, d(v, t) >= d(L, t) - d(L, v) and
+    d(v, t) >= d(v, L) - d(t, L), which gives a lower bound that needs no
+    coordinates. Unreachable distances are replaced by a bound larger than
+    any shortest path, so that the potentials stay finite and consistent.
+
+    Attributes:
+        landmarks    selected landmark nodes
+        dist_from    dist_from[k][v] is d(landmarks[k], v)
+        dist_to      dist_to[k][v] is d(v, landmarks[k])
+        active       number of landmarks used by each query
+    """
+    def __init__(self, graph, count=16, strategy='avoid', active=4, seed=0):
+        if graph.first is None or graph.edge_u:
+            graph.build_csr()
+        self.graph = graph
+        self.landmarks = []
+        self.dist_from = []
+        self.dist_to = []
+        self.active = active
+        self.unreachable = sum(graph.weight) + 1
+        self.random = random.Random(seed)
+        if strategy == 'farthest':
+            self.select_farthest(count)
+        elif strategy == 'avoid':
+            self.select_avoid(count)
+        else:
+            raise ValueError("unknown landmark strategy: %s" % strategy)
+
+    def add_landmark(self, landmark):
+        """Precompute distances from and to a new landmark."""
+        graph = self.graph
+        unreachable = self.unreachable
+        dist_from = one_to_all(graph.first, graph.head, graph.weight, landmark)[0]
+        dist_to = one_to_all(graph.firstR, graph.headR, graph.weightR, landmark)[0]
+        for dist in (dist_from, dist_to):
+            for v, d in enumerate(dist):
+                if d == float('inf'):
+                    dist[v] = unreachable
+        self.landmarks.append(landmark)
+        self.dist_from.append(dist_from)
+        self.dist_to.append(dist_to)
+
+    def connected_nodes(self):
+        """Nodes with at least one edge (isolated nodes make poor landmarks)."""
+        first = self.graph.first
+        firstR = self.graph.firstR
+        return [v for v in range(len(first)-1)
+                if first[v] < first[v+1] or firstR[v] < firstR[v+1]]
+
+    def select_farthest(self, count):
+        """Farthest strategy: each new landmark is the node farthest away
+        from the landmarks selected so far."""
+        candidates = self.connected_nodes()
+        if not candidates:
+            return
+        self.add_landmark(self.random.choice(candidates))
+        unreachable = self.unreachable
+        while len(self.landmarks) < min(count, len(candidates)):
+            best, best_dist = None, -1
+            for v in candidates:
+                d = min(min(dist_from[v], dist_to[v]) for dist_from, dist_to
+                        in zip(self.dist_from, self.dist_to))
+                if d != unreachable and d > best_dist and v not in self.landmarks:
+                    best, best_dist = v, d
+            if best is None:
+                # Remaining nodes are unreachable from all landmarks
+                best = self.random.choice([v for v in candidates
+                                           if v not in self.landmarks])
+            self.add_landmark(best)
+
+    def select_avoid(self, count):
+        """Avoid strategy: grow a shortest path tree from a random root and
+        pick a leaf in the subtree whose nodes are worst covered by the
+        current landmarks."""
+        graph = self.graph
+        candidates = self.connected_nodes()
+        while len(self.landmarks) < min(count, len(candidates)):
+            root = self.random.choice(candidates)
+            dist, parent = one_to_all(graph.first, graph.head, graph.weight, root)
+            n = len(dist)
+            bound = [0]*n
+            for dist_from, dist_to in zip(self.dist_from, self.dist_to):
+                for v in range(n):
+                    b = max(dist_from[v] - dist_from[root],
+                            dist_to[root] - dist_to[v])
+                    if b > bound[v]:
+                        bound[v] = b
+            # Weight is the gap between true distance and current lower bound
+            order = sorted((v for v in range(n) if dist[v] != float('inf')),
+                           key=dist.__getitem__, reverse=True)
+            size = [0]*n
+            children = [[] for _ in range(n)]
+            for v in order:
+                size[v] += dist[v] - bound[v]
+                if v in self.landmarks:
+                    size[v] = -float('inf')
+                if parent[v] != -1:
+                    size[parent[v]] += size[v]
+                    children[parent[v]].append(v)
+            # Descend into the child of largest size until reaching a leaf
+            v = root
+            while children[v]:
+                v = max(children[v], key=size.__getitem__)
+            if v in self.landmarks or size[v] == -float('inf'):
+                v = self.random.choice([u for u in candidates
+                                        if u not in self.landmarks])
+            self.add_landmark(v)
+
+    def potential(self, start, end):
+        """Potential function for Graph.potential.
+
+        Only the active landmarks giving the best lower bound on
+        d(start, end) are used by a query."""
+        scored = []
+        for dist_from, dist_to in zip(self.dist_from, self.dist_to):
+            b = max(dist_from[end] - dist_from[start],
+                    dist_to[start] - dist_to[end])
+            scored.append((b, dist_from, dist_to))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        # (d(L, start), d(L, end), d(start, L), d(end, L), dist_from, dist_to)
+        used = [(dist_from[start], dist_from[end], dist_to[start], dist_to[end],
+                 dist_from, dist_to) for _, dist_from, dist_to
+                in scored[:self.active]]
+        def potential(v):
+            to_end = 0
+            from_start = 0
+            for ls, le, sl, el, dist_from, dist_to in used:
+                lv = dist_from[v]
+                vl = dist_to[v]
+                b = le - lv
+                if b > to_end:
+                    to_end = b
+                b = vl - el
+                if b > to_end:
+                    to_end = b
+                b = lv - ls
+                if b > from_start:
+                    from_start = b
+                b = sl - vl
+                if b > from_start:
+                    from_start = b
+            return (to_end - from_start)/2
+        return potential
+
+
+if __name__ == '__main__':
+    # Input format: same as bidirectional_dijkstra.py (no coordinates)
+    n, m = list(map(int, input().split()))
+    graph = Graph(m, n)
+    for i in range(m):
+        (u, v, w) = list(map(int, input().split()))
+        graph.add_edge(u, v, w)
+    landmarks = Landmarks(graph)
+    graph.potential = landmarks.potential
+    q = int(input())
+    queries = []
+    for i in range(q):
+        (u, v) = list(map(int, input().split()))
+        queries.append((u, v))
+    results = []
+    for u, v in queries:
+        dist = graph.distance(u, v)
+        if dist == float('inf'):
+            dist = -1
+        else:
+            dist = int(round(dist))
+        results.append(dist)
+    print(" ".join(list(map(str, results))))
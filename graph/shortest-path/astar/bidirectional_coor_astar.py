@@ -1,133 +1,485 @@
 #Uses python3
 
-import heapq
-from math import sqrt
-
-class Graph:
-    """Graph represented in adjacency list.
-
-    Attributes:
-        edges        number of edges
-        nodes        number of nodes
-        adj          adjacency list
-        adjR         adjacency list of reverse graph
-        coor         coordinates (x, y)
+import os
+import sys
+from array import array
+from math import asin, cos, hypot, isnan, radians, sin, sqrt
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'dijkstra'))
+from csr_graph import CSRGraph
+from priority_queues import logged_pop
+
+# Mean radius of the Earth in metres
+EARTH_RADIUS = 6371008.8
+
+def euclidean_potential(x, y, start, end, scale):
+    """Forward potential function of a query from planar coordinates.
+
+    The potential of v is scale times half the difference of the
+    straight-line distances from v to end and from v to start."""
+    sx = x[start]
+    sy = y[start]
+    tx = x[end]
+    ty = y[end]
+    half = scale / 2
+    def potential(v):
+        return (hypot(x[v] - tx, y[v] - ty) - hypot(x[v] - sx, y[v] - sy)) * half
+    return potential
+
+def haversine_potential(x, y, start, end, scale):
+    """Forward potential function of a query from longitudes (x) and
+    latitudes (y) in degrees, with great-circle distances in metres."""
+    sx = radians(x[start])
+    sy = radians(y[start])
+    tx = radians(x[end])
+    ty = radians(y[end])
+    cos_s = cos(sy)
+    cos_t = cos(ty)
+    # Half of the difference of the distances 2 R asin(sqrt(a))
+    factor = EARTH_RADIUS * scale
+    def potential(v):
+        lon = radians(x[v])
+        lat = radians(y[v])
+        c = cos(lat)
+        a_t = sin((lat - ty) / 2)**2 + c * cos_t * sin((lon - tx) / 2)**2
+        a_s = sin((lat - sy) / 2)**2 + c * cos_s * sin((lon - sx) / 2)**2
+        return (asin(sqrt(min(1, a_t))) - asin(sqrt(min(1, a_s)))) * factor
+    return potential
+
+HEURISTICS = {
+    'euclidean': euclidean_potential,
+    'haversine': haversine_potential,
+}
+
+# Block kernels: same potentials as above, but the returned function takes a
+# NumPy array of nodes (e.g. the heads of an adjacency block) and fills all
+# their potentials in one vectorised call. NumPy is only imported when one of
+# them is used.
+
+def euclidean_block(x, y, start, end, scale):
+    """Vectorised euclidean_potential over an array of nodes."""
+    import numpy as np
+    x = np.frombuffer(x, dtype=np.float64)
+    y = np.frombuffer(y, dtype=np.float64)
+    sx = x[start]
+    sy = y[start]
+    tx = x[end]
+    ty = y[end]
+    half = scale / 2
+    def potential(nodes):
+        vx = x[nodes]
+        vy = y[nodes]
+        return (np.hypot(vx - tx, vy - ty) - np.hypot(vx - sx, vy - sy)) * half
+    return potential
+
+def haversine_block(x, y, start, end, scale):
+    """Vectorised haversine_potential over an array of nodes."""
+    import numpy as np
+    x = np.frombuffer(x, dtype=np.float64)
+    y = np.frombuffer(y, dtype=np.float64)
+    sx = radians(x[start])
+    sy = radians(y[start])
+    tx = radians(x[end])
+    ty = radians(y[end])
+    cos_s = cos(sy)
+    cos_t = cos(ty)
+    factor = EARTH_RADIUS * scale
+    def potential(nodes):
+        lon = np.radians(x[nodes])
+        lat = np.radians(y[nodes])
+        c = np.cos(lat)
+        a_t = np.sin((lat - ty) / 2)**2 + c * cos_t * np.sin((lon - tx) / 2)**2
+        a_s = np.sin((lat - sy) / 2)**2 + c * cos_s * np.sin((lon - sx) / 2)**2
+        return (np.arcsin(np.sqrt(np.minimum(1, a_t)))
+                - np.arcsin(np.sqrt(np.minimum(1, a_s)))) * factor
+    return potential
+
+BLOCK_HEURISTICS = {
+    'euclidean': euclidean_block,
+    'haversine': haversine_block,
+}
+
+class CoordinateView:
+    """coor sequence of (x, y) tuples over the coordinate arrays of a Graph.
+
+    A node without coordinates has NaN in both arrays and None in the view."""
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, v):
+        x = self.x[v]
+        return None if isnan(x) else (x, self.y[v])
+
+    def __setitem__(self, v, c):
+        self.x[v], self.y[v] = (float('nan'), float('nan')) if c is None else c
+
+class Graph(CSRGraph):
+    """Graph in CSR form (see ../dijkstra/csr_graph.py) with coordinates,
+    queried by bidirectional A* algorithm.
+
+    The queue may be HeapQueue or IndexedDaryHeap of
+    ../dijkstra/priority_queues.py: monotone queues need integer keys and do
+    not apply to the A* potentials.
+
+    Attributes (besides those of CSRGraph):
+        x            first coordinate of each node (NaN if none)
+        y            second coordinate of each node (NaN if none)
+        coor         (x, y) of each node (None if none), as a view of x and y
+        heuristic    heuristic(x, y, start, end, heuristic_scale) returns the
+                     forward potential function of a query from x and y (a
+                     function of HEURISTICS)
+        heuristic_scale
+                     factor applied to the distances of heuristic, e.g. one
+                     over the top speed if weights are travel times
+        block_heuristic
+                     block kernel (a function of BLOCK_HEURISTICS) used
+                     instead of heuristic to compute the potentials of all
+                     new neighbours of a settled node at once; None (the
+                     default) computes each potential when its node is
+                     first seen
+        potential    potential(start, end) returns the forward potential
+                     function of a query (average of the estimates to end and
+                     from start); potentials of heuristic if None
+        internal     internal id of each node id given by the caller after
+                     renumber() (None if nodes were not renumbered)
+        external     node id given by the caller of each internal id
     """
+    # Potentials are not integers
+    DIST_TYPECODE = 'd'
+    POTENTIALS = True
+
     def __init__(self, m, n):
-        self.edges = m
-        self.nodes = n
-        self.adj = [[] for _ in range(n+1)]
-        self.adjR = None
-        self.coor = [None]*(n+1)
+        super().__init__(m, n)
+        self.x = array('d', [float('nan')])*(n+1)
+        self.y = array('d', [float('nan')])*(n+1)
+        self.heuristic = euclidean_potential
+        self.heuristic_scale = 1
+        self.block_heuristic = None
+        self.potential = None
+        self.internal = None
+        self.external = None
+
+    @property
+    def coor(self):
+        return CoordinateView(self.x, self.y)
+
+    @coor.setter
+    def coor(self, coor):
+        if hasattr(coor, 'x') and hasattr(coor, 'y'):
+            # e.g. the arrays of a graph file mapped by ../dijkstra/graph_file.py
+            self.x = coor.x
+            self.y = coor.y
+        else:
+            nan = float('nan')
+            self.x = array('d', [nan if c is None else c[0] for c in coor])
+            self.y = array('d', [nan if c is None else c[1] for c in coor])
 
     def add_edge(self, u, v, w):
         """Add a new edge."""
-        self.adj[u].append((v, w))
-
-    def build_reverse_graph(self):
-        """Build the reverse graph."""
-        adj = self.adj
-        self.adjR = [[] for _ in range(n+1)]
-        adjR = self.adjR
-        for u, edges in enumerate(adj):
-            for v, w in edges:
-                adjR[v].append((u, w))
-        
+        if self.internal is not None:
+            u = self.internal[u]
+            v = self.internal[v]
+        super().add_edge(u, v, w)
+
+    @staticmethod
+    def hilbert_index(x, y, order=16):
+        """Position of cell (x, y) of a 2^order x 2^order grid along the
+        Hilbert curve."""
+        d = 0
+        s = 1 << (order - 1)
+        while s:
+            rx = 1 if x & s else 0
+            ry = 1 if y & s else 0
+            d += s * s * ((3 * rx) ^ ry)
+            # Rotate the quadrant so that the curve stays continuous
+            if not ry:
+                if rx:
+                    x = s - 1 - x
+                    y = s - 1 - y
+                x, y = y, x
+            s >>= 1
+        return d
+
+    def hilbert_order(self):
+        """Nodes sorted along the Hilbert curve through their coordinates
+        (nodes without coordinates come first)."""
+        x = self.x
+        y = self.y
+        nodes = [v for v in range(len(x)) if not isnan(x[v])]
+        min_x = min(x[v] for v in nodes)
+        min_y = min(y[v] for v in nodes)
+        span = max(max(x[v] for v in nodes) - min_x,
+                   max(y[v] for v in nodes) - min_y) or 1
+        scale = ((1 << 16) - 1) / span
+        def key(v):
+            if isnan(x[v]):
+                return -1
+            return self.hilbert_index(int((x[v] - min_x) * scale),
+                                      int((y[v] - min_y) * scale))
+        return sorted(range(self.nodes + 1), key=key)
+
+    def cuthill_mckee_order(self):
+        """Reverse Cuthill-McKee order: breadth-first search on the
+        undirected graph from a node of lowest degree in each component,
+        visiting neighbours by increasing degree, reversed."""
+        first = self.first
+        head = self.head
+        firstR = self.firstR
+        headR = self.headR
+        n = self.nodes + 1
+        degree = [first[v+1] - first[v] + firstR[v+1] - firstR[v]
+                  for v in range(n)]
+        visited = bytearray(n)
+        order = []
+        for root in sorted(range(n), key=degree.__getitem__):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            i = len(order)
+            order.append(root)
+            while i < len(order):
+                u = order[i]
+                i += 1
+                neighbours = set(head[first[u]:first[u+1]])
+                neighbours.update(headR[firstR[u]:firstR[u+1]])
+                for v in sorted(neighbours, key=degree.__getitem__):
+                    if not visited[v]:
+                        visited[v] = 1
+                        order.append(v)
+        order.reverse()
+        return order
+
+    def renumber(self, order=None):
+        """Renumber nodes so that nodes close in the graph are close in
+        memory.
+
+        order lists the nodes in their new order. By default it follows a
+        Hilbert curve through the coordinates if every node 1..n has some,
+        and is the reverse Cuthill-McKee order otherwise. The CSR arrays and
+        coordinates are rebuilt in the new order. Node ids passed to
+        add_edge(), distance() and distance_matrix() are translated through
+        internal, so callers keep using their own ids; potential functions
+        (Graph.potential, e.g. ALT landmarks built after renumbering) see
+        internal ids."""
+        if self.first is None or self.edge_u:
+            self.build_csr()
+        n = self.nodes + 1
+        if order is None:
+            if not any(isnan(x) for x in self.x[1:]):
+                order = self.hilbert_order()
+            else:
+                order = self.cuthill_mckee_order()
+        # Compose with a previous renumbering so that ids stay the caller's
+        external = (array('i', order) if self.external is None
+                    else array('i', [self.external[v] for v in order]))
+        position = array('i', [0])*n
+        for new, v in enumerate(order):
+            position[v] = new
+        first = self.first
+        tail = array('i')
+        for u in order:
+            tail.extend(array('i', [position[u]])*(first[u+1]-first[u]))
+        head = array('i', [position[v] for u in order
+                           for v in self.head[first[u]:first[u+1]]])
+        weight = array('q')
+        for u in order:
+            weight.extend(self.weight[first[u]:first[u+1]])
+        self.first, self.head, self.weight = self.pack(n, tail, head, weight)
+        self.firstR, self.headR, self.weightR = self.pack(n, head, tail, weight)
+        self.x = array('d', [self.x[v] for v in order])
+        self.y = array('d', [self.y[v] for v in order])
+        self.external = external
+        self.internal = array('i', [0])*n
+        for new, v in enumerate(external):
+            self.internal[v] = new
+
     def distance(self, start, end):
         """Compute shortest distance using bidirectional A* algorithm."""
+        if self.internal is not None:
+            start = self.internal[start]
+            end = self.internal[end]
         if start == end:
+            if self.stats is not None:
+                self.stats.record(0, 0, 0, 0, end if self.external is None
+                                  else self.external[end])
             return 0
-        if self.adjR == None:
-            self.build_reverse_graph()
-        n = self.nodes
-        m = self.edges
-        adj = self.adj
-        adjR = self.adjR
-        sx = self.coor[start][0]
-        sy = self.coor[start][1]
-        tx = self.coor[end][0]
-        ty = self.coor[end][1]
-        adjustment = sqrt((tx-sx)**2 + (ty-sy)**2)  # add to final result
+        if self.first is None or self.edge_u:
+            self.build_csr()
+        first = self.first
+        head = self.head
+        weight = self.weight
+        firstR = self.firstR
+        headR = self.headR
+        weightR = self.weightR
+        block = None
+        if self.potential is not None:
+            potential_function = self.potential(start, end)
+        elif self.block_heuristic is not None:
+            block = self.block_heuristic(self.x, self.y, start, end,
+                                         self.heuristic_scale)
+        else:
+            potential_function = self.heuristic(self.x, self.y, start, end,
+                                                self.heuristic_scale)
+        # The backward potential is the negative of the forward potential
+        if block is None:
+            potential_start = potential_function(start)
+            potential_end = -potential_function(end)
+        else:
+            import numpy as np
+            potential_start, potential_end = block(np.array([start, end])).tolist()
+            potential_end = -potential_end
+        adjustment = potential_start + potential_end  # add to final result
+        workspace = self.search_workspace()
+        stamp = workspace.start()
         # For forward search
-        processed = set()
-        potential = {}
-        dist = {}
+        processed = workspace.processed
+        seen = workspace.seen
+        potential = workspace.potential
+        dist = workspace.dist
         dist[start] = 0
-        heap = []
-        potential[start] = adjustment/2
-        heapq.heappush(heap,(0, start))
+        seen[start] = stamp
+        heap = workspace.heap
+        push = heap.push
+        pop = heap.pop
+        potential[start] = potential_start
+        push((0, start))
         # For backward search
-        processedB = set()
-        potentialB = {}
-        distB = {}
+        processedB = workspace.processedB
+        seenB = workspace.seenB
+        potentialB = workspace.potentialB
+        distB = workspace.distB
         distB[end] = 0
-        heapB = []
-        potentialB[end] = adjustment/2
-        heapq.heappush(heapB,(0, end))
+        seenB[end] = stamp
+        heapB = workspace.heapB
+        pushB = heapB.push
+        popB = heapB.pop
+        potentialB[end] = potential_end
+        pushB((0, end))
+        if block is not None:
+            # NumPy views of the CSR targets, seen flags and potentials, so
+            # that a whole adjacency block is filled by one kernel call
+            blocks = np.frombuffer(head, dtype=np.int32)
+            blocksR = np.frombuffer(headR, dtype=np.int32)
+            seen_flags = np.frombuffer(seen, dtype=np.int32)
+            seenB_flags = np.frombuffer(seenB, dtype=np.int32)
+            potentials = np.frombuffer(potential, dtype=np.float64)
+            potentialsB = np.frombuffer(potentialB, dtype=np.float64)
+        stats = self.stats
+        if stats is not None:
+            # Popped nodes are logged and counted after the search, so that
+            # the loop keeps no counters when statistics are disabled
+            popped = []
+            poppedB = []
+            pop = logged_pop(pop, popped.append)
+            popB = logged_pop(popB, poppedB.append)
         shortest = float('inf')
+        result = -1
+        meeting = None
         while heap and heapB:
             # For forward search
             if heap:
-                d, u = heapq.heappop(heap)
-                if u not in processed:
-                    processed.add(u)
+                d, u = pop()
+                if processed[u] != stamp:
+                    processed[u] = stamp
                     dist1 = potential[u]
-                    for v, w in adj[u]:
-                        if v in processed:
+                    if block is not None:
+                        nodes = blocks[first[u]:first[u+1]]
+                        nodes = nodes[seen_flags[nodes] != stamp]
+                        potentials[nodes] = block(nodes)
+                    for i in range(first[u], first[u+1]):
+                        v = head[i]
+                        if processed[v] == stamp:
                             continue
-                        (x, y) = self.coor[v]
-                        if v in potential:
+                        # A potential is computed when its node is first seen
+                        # (or was filled above for the whole block)
+                        if seen[v] == stamp or block is not None:
                             dist2 = potential[v]
                         else:
-                            dist2 = (sqrt((x-tx)**2 + (y-ty)**2) - sqrt((x-sx)**2 + (y-sy)**2))/2
+                            dist2 = potential_function(v)
                             potential[v] = dist2
-                        new_dist = dist[u] + w - dist1 + dist2
-                        if dist.get(v, -1) == -1:
+                        new_dist = dist[u] + weight[i] - dist1 + dist2
+                        if seen[v] != stamp:
+                            seen[v] = stamp
                             dist[v] = new_dist
-                            heapq.heappush(heap,(new_dist, v))
+                            push((new_dist, v))
                         elif dist[v] > new_dist:
                             dist[v] = new_dist
-                            heapq.heappush(heap,(new_dist, v))
-                        if v in processedB:
+                            push((new_dist, v))
+                        if processedB[v] == stamp:
                             length = distB[v] + new_dist
                             if length < shortest:
                                 shortest = length
-                    if u in processedB:
-                        return shortest + adjustment
+                                meeting = v
+                    if processedB[u] == stamp:
+                        result = shortest + adjustment
+                        break
             else:
-                return shortest + adjustment
+                result = shortest + adjustment
+                break
             # For backward search
             if heapB:
-                d, u = heapq.heappop(heapB)
-                if u not in processedB:
-                    processedB.add(u)
+                d, u = popB()
+                if processedB[u] != stamp:
+                    processedB[u] = stamp
                     dist1 = potentialB[u]
-                    for v, w in adjR[u]:
-                        if v in processedB:
+                    if block is not None:
+                        nodes = blocksR[firstR[u]:firstR[u+1]]
+                        nodes = nodes[seenB_flags[nodes] != stamp]
+                        potentialsB[nodes] = -block(nodes)
+                    for i in range(firstR[u], firstR[u+1]):
+                        v = headR[i]
+                        if processedB[v] == stamp:
                             continue
-                        (x, y) = self.coor[v]
-                        if v in potentialB:
+                        if seenB[v] == stamp or block is not None:
                             dist2 = potentialB[v]
                         else:
-                            dist2 = potentialB.get(v, (sqrt((x-sx)**2 + (y-sy)**2) - sqrt((x-tx)**2 + (y-ty)**2))/2)
+                            dist2 = -potential_function(v)
                             potentialB[v] = dist2
-                        new_dist = distB[u] + w - dist1 + dist2
-                        if distB.get(v, -1) == -1:
+                        new_dist = distB[u] + weightR[i] - dist1 + dist2
+                        if seenB[v] != stamp:
+                            seenB[v] = stamp
                             distB[v] = new_dist
-                            heapq.heappush(heapB,(new_dist, v))
+                            pushB((new_dist, v))
                         elif distB[v] > new_dist:
                             distB[v] = new_dist
-                            heapq.heappush(heapB,(new_dist, v))
-                        if v in processed:
+                            pushB((new_dist, v))
+                        if processed[v] == stamp:
                             length = dist[v] + new_dist
                             if length < shortest:
                                 shortest = length
-                    if u in processed:
-                        return shortest + adjustment
+                                meeting = v
+                    if processed[u] == stamp:
+                        result = shortest + adjustment
+                        break
             else:
-                return shortest + adjustment
-        return -1
+                result = shortest + adjustment
+                break
+        if stats is not None:
+            # The first pop of a node settles it, any later pop is stale
+            forward = set(popped)
+            backward = set(poppedB)
+            settled = len(forward) + len(backward)
+            pops = len(popped) + len(poppedB)
+            relaxed = (sum(first[u+1] - first[u] for u in forward)
+                       + sum(firstR[u+1] - firstR[u] for u in backward))
+            if meeting is not None and self.external is not None:
+                meeting = self.external[meeting]
+            stats.record(settled, pops + len(heap) + len(heapB),
+                         pops - settled, relaxed, meeting)
+        return result
 
+    def distance_matrix(self, sources, targets):
+        """Compute shortest distances from every source to every target
+        (see CSRGraph.distance_matrix), with the caller's node ids."""
+        if self.internal is not None:
+            sources = [self.internal[s] for s in sources]
+            targets = [self.internal[t] for t in targets]
+        return super().distance_matrix(sources, targets)
 
 if __name__ == '__main__':
     # Input format
@@ -145,19 +497,32 @@ if __name__ == '__main__':
     # Line n+m+3:   s2 t2
     # ...
     # Line n+m+q+1: sq tq
-    # x,y  :  Cartesian coordinates
+    # x,y  :  Cartesian coordinates (integer or decimal)
     # 1 <= s,t,u,v <= n  :  nodes in 1-based indices
     # q  :  number of queries for path distance between node s and node t
     # n  :  number of nodes
     # m  :  number of edges
+    # Usage: python3 bidirectional_coor_astar.py [--renumber] [--haversine]
+    #                                             [--block] < input
+    #     --renumber stores nodes along a Hilbert curve (see Graph.renumber)
+    #     --haversine reads x,y as longitude, latitude in degrees, with
+    #     weights in metres
+    #     --block computes potentials per adjacency block with NumPy
+    import sys
     n, m = list(map(int, input().split()))
     graph = Graph(m, n)
+    heuristic = 'haversine' if '--haversine' in sys.argv else 'euclidean'
+    graph.heuristic = HEURISTICS[heuristic]
+    if '--block' in sys.argv:
+        graph.block_heuristic = BLOCK_HEURISTICS[heuristic]
     for i in range(1, n+1):
-        (x, y) = list(map(int, input().split()))
+        (x, y) = list(map(float, input().split()))
         graph.coor[i] = (x, y)
     for i in range(m):
         (u, v, w) = list(map(int, input().split()))
         graph.add_edge(u, v, w)
+    if '--renumber' in sys.argv:
+        graph.renumber()
     q = int(input())
     queries = []
     for i in range(q):
@@ -0,0 +1,360 @@
+#Uses python3
+
+import gc
+import json
+import math
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[0:0] = [os.path.join(HERE, 'dijkstra'), os.path.join(HERE, 'astar')]
+
+import bidirectional_coor_astar
+import bidirectional_dijkstra
+from alt import Landmarks
+from contraction_hierarchies import ContractionHierarchy
+from dijkstra import distance
+from hub_labeling import HubLabels
+from search_stats import SearchStats
+
+# Generators return (n, coor, edges): nodes are 1..n, coor[v] is the integer
+# (x, y) of v (coor[0] is None) and edges are (u, v, w) triples. Every weight
+# is at least the Euclidean length of its edge, so the Euclidean potential of
+# bidirectional_coor_astar.py stays a lower bound.
+
+def edge_weight(coor, u, v, rng):
+    """Length of u->v times a random detour factor in [1, 1.5]."""
+    (x1, y1), (x2, y2) = coor[u], coor[v]
+    length = math.hypot(x1 - x2, y1 - y2)
+    return max(1, math.ceil(length * rng.uniform(1, 1.5)))
+
+def grid_graph(size, seed=0):
+    """Square grid of about size nodes with two-way edges between
+    horizontal and vertical neighbours, 100 units apart."""
+    rng = random.Random(seed)
+    k = max(1, math.isqrt(size))
+    coor = [None] + [(100*i, 100*j) for i in range(k) for j in range(k)]
+    edges = []
+    for i in range(k):
+        for j in range(k):
+            u = i*k + j + 1
+            for v in ((u + 1) if j + 1 < k else 0, (u + k) if i + 1 < k else 0):
+                if v:
+                    w = edge_weight(coor, u, v, rng)
+                    edges += [(u, v, w), (v, u, w)]
+    return k*k, coor, edges
+
+def geometric_graph(size, degree=6, seed=0):
+    """Random geometric graph: size points uniform in a square, with two-way
+    edges between points closer than the radius that gives the requested
+    average degree."""
+    rng = random.Random(seed)
+    side = 1000 * math.isqrt(size)
+    radius = side * math.sqrt(degree / (math.pi * size))
+    coor = [None] + [(rng.randrange(side), rng.randrange(side))
+                     for _ in range(size)]
+    # Points are bucketed in cells of width radius, so only the 3x3 cells
+    # around a point need to be checked
+    cells = {}
+    for v in range(1, size+1):
+        x, y = coor[v]
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(v)
+    edges = []
+    for (cx, cy), nodes in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for v in cells.get((cx + dx, cy + dy), ()):
+                    for u in nodes:
+                        if u < v and math.dist(coor[u], coor[v]) <= radius:
+                            w = edge_weight(coor, u, v, rng)
+                            edges += [(u, v, w), (v, u, w)]
+    return size, coor, edges
+
+def power_law_graph(size, attach=2, seed=0):
+    """Preferential attachment (Barabasi-Albert) graph: each new node gets
+    two-way edges to attach earlier nodes chosen with probability
+    proportional to their degree. Nodes are placed uniformly at random."""
+    rng = random.Random(seed)
+    side = 1000 * math.isqrt(size)
+    coor = [None] + [(rng.randrange(side), rng.randrange(side))
+                     for _ in range(size)]
+    # Every edge adds both of its ends, so a uniform pick is degree-biased
+    ends = list(range(1, min(size, attach) + 1))
+    edges = []
+    for v in range(attach + 1, size + 1):
+        targets = set()
+        while len(targets) < attach:
+            targets.add(rng.choice(ends))
+        for u in targets:
+            w = edge_weight(coor, u, v, rng)
+            edges += [(u, v, w), (v, u, w)]
+            ends += [u, v]
+    return size, coor, edges
+
+GENERATORS = {
+    'grid': grid_graph,
+    'geometric': geometric_graph,
+    'powerlaw': power_law_graph,
+}
+
+def random_queries(n, count, seed=0):
+    """count random (s, t) pairs of nodes in 1..n."""
+    rng = random.Random(seed)
+    return [(rng.randint(1, n), rng.randint(1, n)) for _ in range(count)]
+
+def write_input(f, n, coor, edges, queries, form='bidirectional'):
+    """Write a graph and its queries in the input format of dijkstra.py
+    (first query only), bidirectional_dijkstra.py or
+    bidirectional_coor_astar.py ('dijkstra', 'bidirectional' or 'astar')."""
+    f.write("%d %d\n" % (n, len(edges)))
+    if form == 'astar':
+        f.writelines("%d %d\n" % coor[v] for v in range(1, n+1))
+    f.writelines("%d %d %d\n" % edge for edge in edges)
+    if form == 'dijkstra':
+        f.write("%d %d\n" % queries[0])
+    else:
+        f.write("%d\n" % len(queries))
+        f.writelines("%d %d\n" % query for query in queries)
+
+# Engines take (n, coor, edges), do all their preprocessing, and return
+# (query, collect): query(s, t) answers a query, and collect(stats) attaches
+# a SearchStats collector (None to detach), or is None if the engine does
+# not report statistics.
+
+def build_graph(graph_class, n, edges):
+    graph = graph_class(len(edges), n)
+    for u, v, w in edges:
+        graph.add_edge(u, v, w)
+    graph.build_csr()
+    return graph
+
+def dijkstra_engine(n, coor, edges):
+    adj = [[] for _ in range(n+1)]
+    cost = [[] for _ in range(n+1)]
+    for u, v, w in edges:
+        adj[u].append(v)
+        cost[u].append(w)
+    collector = [None]
+    def query(s, t):
+        return distance(adj, cost, s, t, stats=collector[0])
+    def collect(stats):
+        collector[0] = stats
+    return query, collect
+
+def bidirectional_dijkstra_engine(n, coor, edges):
+    graph = build_graph(bidirectional_dijkstra.Graph, n, edges)
+    graph.search_workspace()
+    return graph.distance, lambda stats: setattr(graph, 'stats', stats)
+
+def astar_engine(n, coor, edges):
+    graph = build_graph(bidirectional_coor_astar.Graph, n, edges)
+    graph.coor = coor
+    graph.search_workspace()
+    return graph.distance, lambda stats: setattr(graph, 'stats', stats)
+
+def astar_renumbered_engine(n, coor, edges):
+    graph = build_graph(bidirectional_coor_astar.Graph, n, edges)
+    graph.coor = coor
+    graph.renumber()
+    graph.search_workspace()
+    return graph.distance, lambda stats: setattr(graph, 'stats', stats)
+
+def astar_block_engine(n, coor, edges):
+    graph = build_graph(bidirectional_coor_astar.Graph, n, edges)
+    graph.coor = coor
+    graph.block_heuristic = bidirectional_coor_astar.euclidean_block
+    graph.search_workspace()
+    return graph.distance, lambda stats: setattr(graph, 'stats', stats)
+
+def alt_engine(n, coor, edges):
+    graph = build_graph(bidirectional_coor_astar.Graph, n, edges)
+    graph.potential = Landmarks(graph).potential
+    graph.search_workspace()
+    return graph.distance, lambda stats: setattr(graph, 'stats', stats)
+
+def contraction_hierarchies_engine(n, coor, edges):
+    graph = build_graph(bidirectional_dijkstra.Graph, n, edges)
+    return ContractionHierarchy(graph).distance, None
+
+def hub_labeling_engine(n, coor, edges):
+    graph = build_graph(bidirectional_dijkstra.Graph, n, edges)
+    return HubLabels.build(graph).distance, None
+
+ENGINES = {
+    'dijkstra': dijkstra_engine,
+    'bidirectional_dijkstra': bidirectional_dijkstra_engine,
+    'bidirectional_coor_astar': astar_engine,
+    'astar_renumbered': astar_renumbered_engine,
+    'astar_block': astar_block_engine,
+    'alt': alt_engine,
+    'contraction_hierarchies': contraction_hierarchies_engine,
+    'hub_labeling': hub_labeling_engine,
+}
+
+# Contraction and labeling take minutes on grids and power-law graphs of a
+# few thousand nodes, so they only run when asked for
+DEFAULT_ENGINES = ('dijkstra', 'bidirectional_dijkstra',
+                   'bidirectional_coor_astar', 'astar_renumbered', 'alt')
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[(len(values) - 1) * p // 100]
+
+def run_engine(name, n, coor, edges, queries, memory=True):
+    """Preprocess and answer queries with one engine.
+
+    Returns the report of the run and the list of results. Memory is the
+    peak allocated by Python during preprocessing, measured by tracemalloc
+    on a separate build since tracing slows allocations down (None if
+    memory is False). Settled counts come from a second pass over the
+    queries with a statistics collector, so they do not skew the latencies."""
+    peak = None
+    if memory:
+        tracemalloc.start()
+        ENGINES[name](n, coor, edges)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    begin = time.perf_counter()
+    query, collect = ENGINES[name](n, coor, edges)
+    preprocessing = time.perf_counter() - begin
+    latencies = []
+    results = []
+    # As in timeit, garbage collection pauses are kept out of the latencies
+    gc.collect()
+    gc.disable()
+    for s, t in queries:
+        begin = time.perf_counter()
+        dist = query(s, t)
+        latencies.append(time.perf_counter() - begin)
+        if dist == float('inf'):
+            dist = -1
+        results.append(int(round(dist)))
+    gc.enable()
+    report = {
+        'preprocessing_s': preprocessing,
+        'memory_bytes': peak,
+        'p50_ms': 1000 * percentile(latencies, 50),
+        'p99_ms': 1000 * percentile(latencies, 99),
+        'settled_mean': None,
+        'settled_p99': None,
+    }
+    if collect is not None:
+        stats = SearchStats()
+        collect(stats)
+        for s, t in queries:
+            query(s, t)
+        collect(None)
+        settled = stats.summary()['settled']
+        report['settled_mean'] = settled['mean']
+        report['settled_p99'] = settled['p99']
+    return report, results
+
+def run_suite(graphs, engines, queries=200, seed=0, memory=True):
+    """Benchmark every engine on every (generator, size) of graphs.
+
+    Returns a dict keyed by "generator:size" then by engine. Results are
+    checked against the first engine (mismatches are counted)."""
+    suite = {}
+    for generator, size in graphs:
+        n, coor, edges = GENERATORS[generator](size, seed=seed)
+        pairs = random_queries(n, queries, seed)
+        key = "%s:%d" % (generator, size)
+        suite[key] = {}
+        expected = None
+        for name in engines:
+            report, results = run_engine(name, n, coor, edges, pairs, memory)
+            if expected is None:
+                expected = results
+            report['mismatches'] = sum(a != b for a, b in zip(results, expected))
+            suite[key][name] = report
+            print("%-16s %-26s %9.3f %9s %9.3f %9.3f %9s %5d"
+                  % (key, name, report['preprocessing_s'],
+                     '-' if report['memory_bytes'] is None
+                     else "%.1f" % (report['memory_bytes'] / 2**20),
+                     report['p50_ms'],
+                     report['p99_ms'],
+                     '-' if report['settled_mean'] is None
+                     else "%.1f" % report['settled_mean'],
+                     report['mismatches']), file=sys.stderr)
+    return suite
+
+# Timings (relative) and settled counts (absolute) compared by compare()
+CHECKED = ('preprocessing_s', 'p50_ms', 'p99_ms', 'memory_bytes', 'settled_mean')
+
+def compare(suite, baseline, tolerance=0.25):
+    """List the regressions of suite against a baseline saved by a previous
+    run: any wrong result, and any checked measure more than tolerance
+    (relative) above its baseline value."""
+    regressions = []
+    for key, engines in suite.items():
+        for name, report in engines.items():
+            if report['mismatches']:
+                regressions.append("%s %s: %d wrong results"
+                                   % (key, name, report['mismatches']))
+            old = baseline.get(key, {}).get(name)
+            if old is None:
+                continue
+            for measure in CHECKED:
+                if report[measure] is None or old.get(measure) is None:
+                    continue
+                if report[measure] > old[measure] * (1 + tolerance):
+                    regressions.append("%s %s: %s %.4g -> %.4g"
+                                       % (key, name, measure, old[measure],
+                                          report[measure]))
+    return regressions
+
+
+if __name__ == '__main__':
+    # Usage:
+    #     python3 benchmark.py generate GENERATOR SIZE [FORMAT] [QUERIES] [SEED]
+    #         writes a graph to stdout in the input format (dijkstra,
+    #         bidirectional or astar) of dijkstra.py, bidirectional_dijkstra.py
+    #         or bidirectional_coor_astar.py
+    #     python3 benchmark.py run [options]
+    #         --graphs grid:2500,geometric:2500  generators and sizes
+    #         --engines dijkstra,alt             engines (default:
+    #                                            DEFAULT_ENGINES)
+    #         --queries 200                      queries per graph
+    #         --save FILE                        save results as JSON baseline
+    #         --compare FILE                     exit with status 1 on
+    #                                            regressions against FILE
+    #         --tolerance 0.25                   allowed relative slowdown
+    #         --memory 0                         skip the memory measurement
+    # GENERATOR: grid, geometric or powerlaw
+    # The run table (stderr) lists preprocessing (s), memory (MB), p50 and
+    # p99 latency (ms), mean settled nodes and wrong results per engine.
+    command = sys.argv[1]
+    if command == 'generate':
+        generator, size = sys.argv[2], int(sys.argv[3])
+        form = sys.argv[4] if len(sys.argv) > 4 else 'bidirectional'
+        count = int(sys.argv[5]) if len(sys.argv) > 5 else 100
+        seed = int(sys.argv[6]) if len(sys.argv) > 6 else 0
+        n, coor, edges = GENERATORS[generator](size, seed=seed)
+        write_input(sys.stdout, n, coor, edges, random_queries(n, count, seed), form)
+    elif command == 'run':
+        options = dict(zip(sys.argv[2::2], sys.argv[3::2]))
+        graphs = [(generator, int(size)) for generator, size in
+                  (item.split(':') for item in
+                   options.get('--graphs', 'grid:2500,geometric:2500,powerlaw:2500')
+                   .split(','))]
+        engines = options.get('--engines', ','.join(DEFAULT_ENGINES)).split(',')
+        print("%-16s %-26s %9s %9s %9s %9s %9s %5s"
+              % ("graph", "engine", "prep (s)", "mem (MB)", "p50 (ms)",
+                 "p99 (ms)", "settled", "wrong"), file=sys.stderr)
+        suite = run_suite(graphs, engines, int(options.get('--queries', 200)),
+                          memory=options.get('--memory', '1') != '0')
+        if '--save' in options:
+            with open(options['--save'], 'w') as f:
+                json.dump(suite, f, indent=2, sort_keys=True)
+        if '--compare' in options:
+            with open(options['--compare']) as f:
+                baseline = json.load(f)
+            regressions = compare(suite, baseline,
+                                  float(options.get('--tolerance', 0.25)))
+            for line in regressions:
+                print("regression: " + line)
+            if regressions:
+                sys.exit(1)
@@ -0,0 +1,89 @@
+#Uses python3
+
+import multiprocessing
+import os
+import sys
+from bidirectional_dijkstra import Graph
+
+# Graph used by the worker processes, set by attach() before any query runs
+shared_graph = None
+
+def attach(graph):
+    """Make graph the one used by run_chunk() in this process."""
+    global shared_graph
+    shared_graph = graph
+
+def run_chunk(chunk):
+    """Answer a chunk of (start, end) queries on the shared graph."""
+    distance = shared_graph.distance
+    return [distance(u, v) for u, v in chunk]
+
+class BatchExecutor:
+    """Run independent distance queries on a pool of worker processes.
+
+    With the fork start method the workers inherit the graph copy-on-write.
+    The CSR arrays are plain buffers that reference counting never writes to,
+    so their pages stay shared between all workers. Where fork is not
+    available the graph is sent once to each worker when it starts, never
+    with the queries.
+
+    Attributes:
+        graph        Graph shared by the workers
+        processes    number of worker processes
+        chunk_size   number of queries sent to a worker at a time
+    """
+    def __init__(self, graph, processes=None, chunk_size=256):
+        if graph.first is None or graph.edge_u:
+            graph.build_csr()
+        self.graph = graph
+        self.processes = processes or os.cpu_count()
+        self.chunk_size = chunk_size
+        if 'fork' in multiprocessing.get_all_start_methods():
+            attach(graph)
+            context = multiprocessing.get_context('fork')
+            self.pool = context.Pool(self.processes)
+        else:
+            self.pool = multiprocessing.Pool(self.processes, initializer=attach,
+                                             initargs=(graph,))
+
+    def run(self, queries):
+        """Return the distances of all (start, end) queries in input order."""
+        size = self.chunk_size
+        chunks = [queries[i:i+size] for i in range(0, len(queries), size)]
+        results = []
+        for distances in self.pool.imap(run_chunk, chunks):
+            results.extend(distances)
+        return results
+
+    def close(self):
+        """Stop the worker processes."""
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+if __name__ == '__main__':
+    # Input format: same as bidirectional_dijkstra.py
+    # Usage: python3 batch_query.py [processes] < input
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    n, m = list(map(int, input().split()))
+    graph = Graph(m, n)
+    for i in range(m):
+        (u, v, w) = list(map(int, input().split()))
+        graph.add_edge(u, v, w)
+    q = int(input())
+    queries = []
+    for i in range(q):
+        (u, v) = list(map(int, input().split()))
+        queries.append((u, v))
+    with BatchExecutor(graph, processes) as executor:
+        results = executor.run(queries)
+    for i, dist in enumerate(results):
+        if dist == float('inf'):
+            results[i] = -1
+    print(" ".join(list(map(str, results))))
@@ -0,0 +1,68 @@
+#Uses python3
+
+import sys
+import time
+from bidirectional_dijkstra import Graph
+from dijkstra import distance
+from priority_queues import QUEUES
+
+def read_graph(data):
+    """Parse the input of dijkstra.py or bidirectional_dijkstra.py.
+
+    The input of dijkstra.py ends with a single query "s t", while that of
+    bidirectional_dijkstra.py ends with "q" followed by q queries."""
+    n, m = data[0:2]
+    edges = [tuple(data[2+3*i:5+3*i]) for i in range(m)]
+    rest = data[2+3*m:]
+    if len(rest) == 2:
+        queries = [tuple(rest)]
+    else:
+        queries = [tuple(rest[1+2*i:3+2*i]) for i in range(rest[0])]
+    return n, edges, queries
+
+def benchmark(n, edges, queries, repeat=3):
+    """Time every queue on Dijkstra and bidirectional Dijkstra.
+
+    Returns a list of (engine, queue, best time in seconds, results)."""
+    max_weight = max((w for _, _, w in edges), default=0)
+    adj = [[] for _ in range(n+1)]
+    cost = [[] for _ in range(n+1)]
+    for u, v, w in edges:
+        adj[u].append(v)
+        cost[u].append(w)
+    graph = Graph(len(edges), n)
+    for u, v, w in edges:
+        graph.add_edge(u, v, w)
+    graph.build_csr()
+    report = []
+    for name, queue_class in QUEUES.items():
+        queue = queue_class(n+1, max_weight)
+        best = float('inf')
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            results = []
+            for s, t in queries:
+                queue.clear()
+                results.append(distance(adj, cost, s, t, queue))
+            best = min(best, time.perf_counter() - begin)
+        report.append(('dijkstra', name, best, results))
+        graph.queue = queue_class
+        best = float('inf')
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            results = [graph.distance(s, t) for s, t in queries]
+            best = min(best, time.perf_counter() - begin)
+        results = [-1 if d == float('inf') else d for d in results]
+        report.append(('bidirectional_dijkstra', name, best, results))
+    return report
+
+
+if __name__ == '__main__':
+    # Input format: that of dijkstra.py or bidirectional_dijkstra.py
+    # Nodes are used as given (both formats use 1-based indices in practice).
+    n, edges, queries = read_graph(list(map(int, sys.stdin.read().split())))
+    report = benchmark(n, edges, queries)
+    expected = report[0][3]
+    print("%-24s %-6s %10s  %s" % ("engine", "queue", "time (s)", "same results"))
+    for engine, name, best, results in report:
+        print("%-24s %-6s %10.4f  %s" % (engine, name, best, results == expected))
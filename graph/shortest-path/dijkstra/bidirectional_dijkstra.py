@@ -1,105 +1,248 @@
 #Uses python3
 
-import heapq
+from array import array
+from csr_graph import CSRGraph
+from priority_queues import logged_pop
 
-class Graph:
-    """Graph represented in adjacency list.
+class Graph(CSRGraph):
+    """Graph in CSR form (see csr_graph.py) with a connectivity index,
+    queried by bidirectional Dijkstra's algorithm.
 
-    Attributes:
-        edges        number of edges
-        nodes        number of nodes
-        adj          adjacency list
-        adjR         adjacency list of reverse graph
+    Attributes (besides those of CSRGraph):
+        component    strongly connected component of each node, numbered in
+                     topological order of the condensation DAG
+        weak         weakly connected component of each node
     """
     def __init__(self, m, n):
-        self.edges = m
-        self.nodes = n
-        self.adj = [[] for _ in range(n+1)]
-        self.adjR = None
+        super().__init__(m, n)
+        self.component = None
+        self.weak = None
 
-    def add_edge(self, u, v, w):
-        """Add a new edge."""
-        self.adj[u].append((v, w))
+    def build_csr(self):
+        """Build the CSR arrays and the connectivity index."""
+        super().build_csr()
+        self.build_components()
+
+    def build_components(self):
+        """Build the connectivity index with Kosaraju's algorithm.
+
+        Components are numbered in the order the second pass finds them,
+        which is a topological order of the condensation DAG: every edge
+        u->v between two components has component[u] < component[v]. So t
+        is unreachable from s if component[s] > component[t] or if they are
+        in different weak components."""
+        n = self.nodes + 1
+        first = self.first
+        head = self.head
+        firstR = self.firstR
+        headR = self.headR
+        # First pass: order nodes by finishing time of a DFS on the graph
+        order = array('i')
+        visited = bytearray(n)
+        for root in range(n):
+            if visited[root]:
+                continue
+            visited[root] = 1
+            stack = [(root, first[root])]
+            while stack:
+                u, i = stack[-1]
+                if i < first[u+1]:
+                    stack[-1] = (u, i+1)
+                    v = head[i]
+                    if not visited[v]:
+                        visited[v] = 1
+                        stack.append((v, first[v]))
+                else:
+                    stack.pop()
+                    order.append(u)
+        # Second pass: DFS on the reverse graph by decreasing finishing time
+        component = array('i', [-1])*n
+        count = 0
+        for root in reversed(order):
+            if component[root] != -1:
+                continue
+            component[root] = count
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                for i in range(firstR[u], firstR[u+1]):
+                    v = headR[i]
+                    if component[v] == -1:
+                        component[v] = count
+                        stack.append(v)
+            count += 1
+        # Weak components: search both directions
+        weak = array('i', [-1])*n
+        count = 0
+        for root in range(n):
+            if weak[root] != -1:
+                continue
+            weak[root] = count
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                for i in range(first[u], first[u+1]):
+                    v = head[i]
+                    if weak[v] == -1:
+                        weak[v] = count
+                        stack.append(v)
+                for i in range(firstR[u], firstR[u+1]):
+                    v = headR[i]
+                    if weak[v] == -1:
+                        weak[v] = count
+                        stack.append(v)
+            count += 1
+        self.component = component
+        self.weak = weak
+
+    def reachable(self, start, end):
+        """False if end is certainly unreachable from start, in O(1)."""
+        component = self.component
+        return (self.weak[start] == self.weak[end]
+                and component[start] <= component[end])
 
-    def build_reverse_graph(self):
-        """Build the reverse graph."""
-        adj = self.adj
-        self.adjR = [[] for _ in range(n+1)]
-        adjR = self.adjR
-        for u, edges in enumerate(adj):
-            for v, w in edges:
-                adjR[v].append((u, w))
-        
     def distance(self, start, end):
         """Compute shortest distance using bidirectional Dijkstra's algorithm."""
         if start == end:
+            if self.stats is not None:
+                self.stats.record(0, 0, 0, 0, end)
             return 0
-        if self.adjR == None:
-            self.build_reverse_graph()
-        n = self.nodes
-        m = self.edges
-        adj = self.adj
-        adjR = self.adjR
+        if self.first is None or self.edge_u:
+            self.build_csr()
+        if self.component is None:
+            self.build_components()
+        if not self.reachable(start, end):
+            if self.stats is not None:
+                self.stats.record(0, 0, 0, 0, None)
+            return -1
+        first = self.first
+        head = self.head
+        weight = self.weight
+        firstR = self.firstR
+        headR = self.headR
+        weightR = self.weightR
+        # Nodes outside components between those of start and end are pruned
+        component = self.component
+        low = component[start]
+        high = component[end]
+        workspace = self.search_workspace()
+        stamp = workspace.start()
         # For forward search
-        processed = set()
-        dist = {}
+        processed = workspace.processed
+        seen = workspace.seen
+        dist = workspace.dist
         dist[start] = 0
-        heap = []
-        heapq.heappush(heap,(0, start))
+        seen[start] = stamp
+        heap = workspace.heap
+        push = heap.push
+        pop = heap.pop
+        push((0, start))
         # For backward search
-        processedB = set()
-        distB = {}
+        processedB = workspace.processedB
+        seenB = workspace.seenB
+        distB = workspace.distB
         distB[end] = 0
-        heapB = []
-        heapq.heappush(heapB,(0, end))
+        seenB[end] = stamp
+        heapB = workspace.heapB
+        pushB = heapB.push
+        popB = heapB.pop
+        pushB((0, end))
+        stats = self.stats
+        if stats is not None:
+            # Popped nodes are logged and counted after the search, so that
+            # the loop keeps no counters when statistics are disabled
+            popped = []
+            poppedB = []
+            pop = logged_pop(pop, popped.append)
+            popB = logged_pop(popB, poppedB.append)
         shortest = float('inf')
+        result = -1
+        meeting = None
         while heap and heapB:
             # For forward search
             if heap:
-                d, u = heapq.heappop(heap)
-                if u not in processed:
-                    processed.add(u)
-                    for v, w in adj[u]:
-                        if dist.get(v, -1) == -1:
-                            dist[v] = dist[u] + w
-                            heapq.heappush(heap,(dist[v], v))
-                        elif dist[v] > dist[u] + w:
-                            dist[v] = dist[u] + w
-                            heapq.heappush(heap,(dist[v], v))
-                    if dist[u] < shortest:
-                        for v, w in adj[u]:
-                            if v in processedB:
-                                length = dist[u] + distB[v] + w
+                d, u = pop()
+                if processed[u] != stamp:
+                    processed[u] = stamp
+                    du = dist[u]
+                    for i in range(first[u], first[u+1]):
+                        v = head[i]
+                        if component[v] > high:
+                            continue
+                        new_dist = du + weight[i]
+                        if seen[v] != stamp:
+                            seen[v] = stamp
+                            dist[v] = new_dist
+                            push((new_dist, v))
+                        elif dist[v] > new_dist:
+                            dist[v] = new_dist
+                            push((new_dist, v))
+                    if du < shortest:
+                        for i in range(first[u], first[u+1]):
+                            v = head[i]
+                            if processedB[v] == stamp:
+                                length = du + distB[v] + weight[i]
                                 if length < shortest:
                                     shortest = length
-                    if u in processedB:
-                        return shortest
+                                    meeting = v
+                    if processedB[u] == stamp:
+                        result = shortest
+                        break
             else:
-                return shortest
+                result = shortest
+                break
             # For backward search
             if heapB:
-                d, u = heapq.heappop(heapB)
-                if u not in processedB:
-                    processedB.add(u)
-                    for v, w in adjR[u]:
-                        if distB.get(v, -1) == -1:
-                            distB[v] = distB[u] + w
-                            heapq.heappush(heapB,(distB[v], v))
-                        elif distB[v] > distB[u] + w:
-                            distB[v] = distB[u] + w
-                            heapq.heappush(heapB,(distB[v], v))
-                    if distB[u] < shortest:
-                        for v, w in adjR[u]:
-                            if v in processed:
-                                length = distB[u] + dist[v] + w
+                d, u = popB()
+                if processedB[u] != stamp:
+                    processedB[u] = stamp
+                    du = distB[u]
+                    for i in range(firstR[u], firstR[u+1]):
+                        v = headR[i]
+                        if component[v] < low:
+                            continue
+                        new_dist = du + weightR[i]
+                        if seenB[v] != stamp:
+                            seenB[v] = stamp
+                            distB[v] = new_dist
+                            pushB((new_dist, v))
+                        elif distB[v] > new_dist:
+                            distB[v] = new_dist
+                            pushB((new_dist, v))
+                    if du < shortest:
+                        for i in range(firstR[u], firstR[u+1]):
+                            v = headR[i]
+                            if processed[v] == stamp:
+                                length = du + dist[v] + weightR[i]
                                 if length < shortest:
                                     shortest = length
-                    if u in processed:
-                        return shortest
+                                    meeting = v
+                    if processed[u] == stamp:
+                        result = shortest
+                        break
             else:
-                return shortest
-        return -1
+                result = shortest
+                break
+        if stats is not None:
+            # The first pop of a node settles it, any later pop is stale
+            forward = set(popped)
+            backward = set(poppedB)
+            settled = len(forward) + len(backward)
+            pops = len(popped) + len(poppedB)
+            relaxed = (sum(first[u+1] - first[u] for u in forward)
+                       + sum(firstR[u+1] - firstR[u] for u in backward))
+            stats.record(settled, pops + len(heap) + len(heapB),
+                         pops - settled, relaxed, meeting)
+        return result
 
+    def distance_matrix(self, sources, targets):
+        """Compute shortest distances from every source to every target
+        (see CSRGraph.distance_matrix), skipping unreachable targets."""
+        if self.first is None or self.edge_u:
+            self.build_csr()
+        if self.component is None:
+            self.build_components()
+        return super().distance_matrix(sources, targets)
 
 if __name__ == '__main__':
     # Input format
@@ -117,8 +260,14 @@ if __name__ == '__main__':
     # q: number of queries for path distance between node s and node t
     # n: number of nodes
     # m: number of edges
+    # Usage: python3 bidirectional_dijkstra.py [--stats] < input
+    #     --stats writes statistics of the searches to stderr
+    import sys
     n, m = list(map(int, input().split()))
     graph = Graph(m, n)
+    if '--stats' in sys.argv:
+        from search_stats import SearchStats
+        graph.stats = SearchStats()
     for i in range(m):
         (u, v, w) = list(map(int, input().split()))
         graph.add_edge(u, v, w)
@@ -134,3 +283,5 @@ if __name__ == '__main__':
             dist = -1
         results.append(dist)
     print(" ".join(list(map(str, results))))
+    if graph.stats is not None:
+        print(graph.stats.report(), file=sys.stderr)
@@ -0,0 +1,242 @@
+#Uses python3
+
+import heapq
+import sys
+import time
+from array import array
+from bidirectional_dijkstra import Graph
+
+class ContractionHierarchy:
+    """Contraction Hierarchies built on top of a Graph.
+
+    Preprocessing contracts the nodes one by one in order of importance and
+    adds a shortcut u->w whenever u->v->w is the only shortest path through
+    the contracted node v. Each query is then a bidirectional Dijkstra that
+    only follows edges towards nodes of higher rank.
+
+    Attributes:
+        nodes        number of nodes
+        rank         contraction order of each node
+        shortcuts    number of shortcuts added by preprocessing
+        build_time   preprocessing time in seconds
+        first        CSR offsets of upward graph
+        head         CSR targets of upward graph
+        weight       CSR weights of upward graph
+        firstR       CSR offsets of upward reverse graph
+        headR        CSR targets of upward reverse graph
+        weightR      CSR weights of upward reverse graph
+    """
+    def __init__(self, graph, settle_limit=500):
+        self.nodes = graph.nodes
+        self.rank = None
+        self.shortcuts = 0
+        self.build_time = 0
+        self.settle_limit = settle_limit
+        self.preprocess(graph)
+
+    @staticmethod
+    def witness_search(out, source, avoid, targets, limit, settle_limit):
+        """Dijkstra from source skipping node avoid, up to distance limit.
+
+        The search also stops once all targets are settled."""
+        dist = {source: 0}
+        heap = [(0, source)]
+        processed = set()
+        remaining = len(targets)
+        while heap and remaining and len(processed) < settle_limit:
+            d, u = heapq.heappop(heap)
+            if d > limit:
+                break
+            if u in processed:
+                continue
+            processed.add(u)
+            if u in targets:
+                remaining -= 1
+            for v, w in out[u].items():
+                if v == avoid:
+                    continue
+                new_dist = d + w
+                if new_dist < dist.get(v, new_dist+1):
+                    dist[v] = new_dist
+                    heapq.heappush(heap, (new_dist, v))
+        return dist
+
+    def contract(self, out, inn, v, simulate):
+        """Find the shortcuts needed to contract v and add them if asked.
+
+        Returns the number of shortcuts (new edges) required."""
+        added = 0
+        outs = out[v]
+        if not outs:
+            return 0
+        limit = max(outs.values())
+        for u, w1 in inn[v].items():
+            dist = self.witness_search(out, u, v, outs, w1 + limit,
+                                       self.settle_limit)
+            for x, w2 in outs.items():
+                if x == u:
+                    continue
+                length = w1 + w2
+                if dist.get(x, length+1) <= length:
+                    continue
+                if x not in out[u]:
+                    added += 1
+                if not simulate and out[u].get(x, length+1) > length:
+                    out[u][x] = length
+                    inn[x][u] = length
+        return added
+
+    def priority(self, out, inn, deleted, v):
+        """Edge difference plus number of contracted neighbours."""
+        shortcuts = self.contract(out, inn, v, True)
+        return shortcuts - len(out[v]) - len(inn[v]) + deleted[v]
+
+    def preprocess(self, graph):
+        """Order the nodes, add shortcuts and build the upward graphs."""
+        begin = time.perf_counter()
+        if graph.first is None or graph.edge_u:
+            graph.build_csr()
+        n = self.nodes + 1
+        first = graph.first
+        head = graph.head
+        weight = graph.weight
+        out = [{} for _ in range(n)]
+        inn = [{} for _ in range(n)]
+        for u in range(n):
+            for i in range(first[u], first[u+1]):
+                v = head[i]
+                w = weight[i]
+                if u != v and out[u].get(v, w+1) > w:
+                    out[u][v] = w
+                    inn[v][u] = w
+        deleted = [0]*n
+        current = [self.priority(out, inn, deleted, v) for v in range(n)]
+        heap = [(priority, v) for v, priority in enumerate(current)]
+        heapq.heapify(heap)
+        contracted = [False]*n
+        rank = array('i', [0])*n
+        up_u = array('i')
+        up_v = array('i')
+        up_w = array('q')
+        down_u = array('i')
+        down_v = array('i')
+        down_w = array('q')
+        order = 0
+        while heap:
+            # Lazy update: re-insert v if its priority has become worse
+            priority, v = heapq.heappop(heap)
+            if contracted[v] or priority != current[v]:
+                continue
+            priority = self.priority(out, inn, deleted, v)
+            if heap and priority > heap[0][0]:
+                current[v] = priority
+                heapq.heappush(heap, (priority, v))
+                continue
+            contracted[v] = True
+            self.shortcuts += self.contract(out, inn, v, False)
+            rank[v] = order
+            order += 1
+            neighbours = set(out[v])
+            neighbours.update(inn[v])
+            # Remaining edges of v lead to nodes of higher rank
+            for x, w in out[v].items():
+                up_u.append(v)
+                up_v.append(x)
+                up_w.append(w)
+                del inn[x][v]
+                deleted[x] += 1
+            for x, w in inn[v].items():
+                down_u.append(v)
+                down_v.append(x)
+                down_w.append(w)
+                del out[x][v]
+                deleted[x] += 1
+            out[v] = {}
+            inn[v] = {}
+            # Contracting v changes the importance of its neighbours
+            for x in neighbours:
+                current[x] = self.priority(out, inn, deleted, x)
+                heapq.heappush(heap, (current[x], x))
+        self.rank = rank
+        self.first, self.head, self.weight = Graph.pack(n, up_u, up_v, up_w)
+        self.firstR, self.headR, self.weightR = Graph.pack(n, down_u, down_v, down_w)
+        self.build_time = time.perf_counter() - begin
+
+    def distance(self, start, end):
+        """Compute shortest distance using upward bidirectional Dijkstra."""
+        if start == end:
+            return 0
+        first = self.first
+        head = self.head
+        weight = self.weight
+        firstR = self.firstR
+        headR = self.headR
+        weightR = self.weightR
+        # For forward search
+        processed = set()
+        dist = {}
+        dist[start] = 0
+        heap = []
+        heapq.heappush(heap,(0, start))
+        # For backward search
+        processedB = set()
+        distB = {}
+        distB[end] = 0
+        heapB = []
+        heapq.heappush(heapB,(0, end))
+        shortest = float('inf')
+        # Unlike plain bidirectional Dijkstra, the searches cannot stop at the
+        # first meeting node: they stop once neither can improve the result.
+        while heap or heapB:
+            # For forward search
+            if heap:
+                d, u = heapq.heappop(heap)
+                if d >= shortest:
+                    heap = []
+                elif u not in processed:
+                    processed.add(u)
+                    if u in distB and d + distB[u] < shortest:
+                        shortest = d + distB[u]
+                    for i in range(first[u], first[u+1]):
+                        v = head[i]
+                        new_dist = d + weight[i]
+                        if new_dist < dist.get(v, new_dist+1):
+                            dist[v] = new_dist
+                            heapq.heappush(heap,(new_dist, v))
+            # For backward search
+            if heapB:
+                d, u = heapq.heappop(heapB)
+                if d >= shortest:
+                    heapB = []
+                elif u not in processedB:
+                    processedB.add(u)
+                    if u in dist and d + dist[u] < shortest:
+                        shortest = d + dist[u]
+                    for i in range(firstR[u], firstR[u+1]):
+                        v = headR[i]
+                        new_dist = d + weightR[i]
+                        if new_dist < distB.get(v, new_dist+1):
+                            distB[v] = new_dist
+                            heapq.heappush(heapB,(new_dist, v))
+        if shortest == float('inf'):
+            return -1
+        return shortest
+
+
+if __name__ == '__main__':
+    # Input format: same as bidirectional_dijkstra.py
+    # Preprocessing statistics are written to stderr.
+    n, m = list(map(int, input().split()))
+    graph = Graph(m, n)
+    for i in range(m):
+        (u, v, w) = list(map(int, input().split()))
+        graph.add_edge(u, v, w)
+    ch = ContractionHierarchy(graph)
+    print("shortcuts: %d, preprocessing: %.3f s" % (ch.shortcuts, ch.build_time),
+          file=sys.stderr)
+    q = int(input())
+    results = []
+    for i in range(q):
+        (u, v) = list(map(int, input().split()))
+        results.append(ch.distance(u, v))
+    print(" ".join(list(map(str, results))))
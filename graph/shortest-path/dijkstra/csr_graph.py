@@ -0,0 +1,228 @@
+#Uses python3
+
+from array import array
+from priority_queues import HeapQueue
+
+# Shared by the Graph of bidirectional_dijkstra.py and the Graph of
+# ../astar/bidirectional_coor_astar.py: CSR storage built from an edge stream,
+# the search workspace reused by their queries and distance_matrix().
+
+class SearchWorkspace:
+    """Preallocated arrays reused by successive searches on the same graph.
+
+    An entry of dist is only valid if seen holds the version of the current
+    search, and a node is settled only if processed holds that version. A new
+    search therefore just increments the version stamp: nothing is cleared or
+    allocated between queries.
+
+    Attributes:
+        version      version stamp of the current search
+        dist         distances of forward search
+        distB        distances of backward search
+        seen         version at which dist was last set
+        seenB        version at which distB was last set
+        processed    version at which node was settled by forward search
+        processedB   version at which node was settled by backward search
+        potential    potentials of forward search (if requested)
+        potentialB   potentials of backward search (if requested)
+        heap         priority queue of forward search
+        heapB        priority queue of backward search
+        max_weight   largest edge weight the queues were created for
+    """
+    def __init__(self, n, queue, typecode='q', potentials=False,
+                 max_weight=None):
+        self.size = n
+        self.max_weight = max_weight
+        self.version = 0
+        self.dist = array(typecode, [0])*n
+        self.distB = array(typecode, [0])*n
+        self.seen = array('i', [0])*n
+        self.seenB = array('i', [0])*n
+        self.processed = array('i', [0])*n
+        self.processedB = array('i', [0])*n
+        self.potential = array('d', [0])*n if potentials else None
+        self.potentialB = array('d', [0])*n if potentials else None
+        self.heap = queue()
+        self.heapB = queue()
+
+    def start(self):
+        """Begin a new search and return its version stamp."""
+        self.version += 1
+        if self.version == 2**31 - 1:
+            # Stamps are about to overflow: clear them once and start over
+            for flags in (self.seen, self.seenB, self.processed, self.processedB):
+                flags[:] = array('i', [0])*self.size
+            self.version = 1
+        self.heap.clear()
+        self.heapB.clear()
+        return self.version
+
+class CSRGraph:
+    """Graph represented in compressed sparse row (CSR) form.
+
+    Edges are collected by add_edge() into three packed arrays and packed by
+    build_csr() into an offset array plus target/weight arrays, for both the
+    forward and the reverse graph. The edges of node u are found at indices
+    first[u] to first[u+1]-1 of head and weight. Subclasses set DIST_TYPECODE
+    and POTENTIALS for the arrays of their search workspace.
+
+    Attributes:
+        edges        number of edges
+        nodes        number of nodes
+        edge_u       tails of edges added since the last build_csr()
+        edge_v       heads of edges added since the last build_csr()
+        edge_w       weights of edges added since the last build_csr()
+        first        CSR offsets of graph
+        head         CSR targets of graph
+        weight       CSR weights of graph
+        firstR       CSR offsets of reverse graph
+        headR        CSR targets of reverse graph
+        weightR      CSR weights of reverse graph
+        max_weight   largest edge weight
+        workspace    SearchWorkspace reused by queries
+        queue        priority queue class used by queries
+        stats        statistics collector of queries (see search_stats.py),
+                     None to disable
+    """
+    DIST_TYPECODE = 'q'
+    POTENTIALS = False
+
+    def __init__(self, m, n):
+        self.edges = m
+        self.nodes = n
+        self.edge_u = array('i')
+        self.edge_v = array('i')
+        self.edge_w = array('q')
+        self.first = None
+        self.head = None
+        self.weight = None
+        self.firstR = None
+        self.headR = None
+        self.weightR = None
+        self.max_weight = None
+        self.workspace = None
+        self.queue = HeapQueue
+        self.stats = None
+
+    def add_edge(self, u, v, w):
+        """Add a new edge."""
+        self.edge_u.append(u)
+        self.edge_v.append(v)
+        self.edge_w.append(w)
+
+    @staticmethod
+    def pack(n, tail, head, weight):
+        """Pack an edge stream into CSR arrays with a counting sort."""
+        first = array('q', [0])*(n+1)
+        for u in tail:
+            first[u+1] += 1
+        for u in range(n):
+            first[u+1] += first[u]
+        pos = first[:n]
+        m = len(tail)
+        target = array('i', [0])*m
+        cost = array('q', [0])*m
+        for i in range(m):
+            u = tail[i]
+            j = pos[u]
+            pos[u] = j + 1
+            target[j] = head[i]
+            cost[j] = weight[i]
+        return first, target, cost
+
+    def build_csr(self):
+        """Build the forward and reverse CSR arrays from the edge stream."""
+        n = self.nodes + 1
+        tail = self.edge_u
+        head = self.edge_v
+        weight = self.edge_w
+        if self.first is not None:
+            # Edges added after a previous build are merged with packed ones
+            first = self.first
+            for u in range(n):
+                tail.extend(array('i', [u])*(first[u+1]-first[u]))
+            head.extend(self.head)
+            weight.extend(self.weight)
+        self.first, self.head, self.weight = self.pack(n, tail, head, weight)
+        self.firstR, self.headR, self.weightR = self.pack(n, head, tail, weight)
+        self.max_weight = max(weight, default=0)
+        # The stream is no longer needed once packed
+        self.edge_u = array('i')
+        self.edge_v = array('i')
+        self.edge_w = array('q')
+
+    def reachable(self, start, end):
+        """False if end is certainly unreachable from start (always True
+        without a connectivity index)."""
+        return True
+
+    def search_workspace(self):
+        """Return the search workspace, allocating it on first use.
+
+        The workspace is allocated again if the number of nodes, the queue
+        class or the largest edge weight has changed, since bucket queues
+        are sized by the largest edge weight."""
+        workspace = self.workspace
+        if (workspace is None or workspace.size != self.nodes + 1
+                or type(workspace.heap) is not self.queue
+                or workspace.max_weight != self.max_weight):
+            n = self.nodes + 1
+            max_weight = self.max_weight
+            workspace = SearchWorkspace(n, lambda: self.queue(n, max_weight),
+                                        self.DIST_TYPECODE, self.POTENTIALS,
+                                        max_weight)
+            self.workspace = workspace
+        return workspace
+
+    def distance_matrix(self, sources, targets):
+        """Compute shortest distances from every source to every target.
+
+        One Dijkstra search is run per distinct source and stops as soon as
+        all targets are settled. Returns a packed array in row-major order:
+        entry i*len(targets)+j is the distance from sources[i] to targets[j]
+        (-1 if unreachable)."""
+        if self.first is None or self.edge_u:
+            self.build_csr()
+        first = self.first
+        head = self.head
+        weight = self.weight
+        k = len(targets)
+        matrix = array('q', [-1])*(len(sources)*k)
+        columns = {}
+        for j, t in enumerate(targets):
+            columns.setdefault(t, []).append(j)
+        rows = {}
+        for i, s in enumerate(sources):
+            rows.setdefault(s, []).append(i)
+        workspace = self.search_workspace()
+        processed = workspace.processed
+        seen = workspace.seen
+        dist = workspace.dist
+        heap = workspace.heap
+        push = heap.push
+        pop = heap.pop
+        for s, row_ids in rows.items():
+            # Only targets that pass the connectivity index are waited for
+            remaining = sum(1 for t in columns if self.reachable(s, t))
+            stamp = workspace.start()
+            dist[s] = 0
+            seen[s] = stamp
+            push((0, s))
+            while heap and remaining:
+                d, u = pop()
+                if processed[u] == stamp:
+                    continue
+                processed[u] = stamp
+                if u in columns:
+                    remaining -= 1
+                    for i in row_ids:
+                        for j in columns[u]:
+                            matrix[i*k+j] = d
+                for i in range(first[u], first[u+1]):
+                    v = head[i]
+                    new_dist = d + weight[i]
+                    if seen[v] != stamp or new_dist < dist[v]:
+                        seen[v] = stamp
+                        dist[v] = new_dist
+                        push((new_dist, v))
+        return matrix
@@ -0,0 +1,250 @@
+#Uses python3
+
+import heapq
+import sys
+import time
+from array import array
+from collections import deque
+from bidirectional_dijkstra import Graph
+
+class RoutePlanner:
+    """Customizable route planning on a multilevel partition overlay.
+
+    The three phases are kept apart so that new edge weights only require
+    the (fast) customization phase:
+    - Preprocessing looks at the topology only. Nodes are partitioned into
+      cells of at most cell_sizes[0] nodes, and cells of each level are
+      grouped into cells of the next level. A boundary node of level l has
+      an edge to or from another cell of level l.
+    - Customization computes, for every cell, the distances between its
+      boundary nodes inside the cell (a clique of shortcuts). Level 1 uses
+      the edges of the graph, higher levels the cliques of the level below.
+    - A query runs Dijkstra on the original edges only in the cells that
+      contain the source or the target, and on the overlay (cliques and
+      edges between cells) everywhere else.
+
+    Attributes:
+        graph        Graph whose weights are customized
+        levels       number of levels
+        cell         cell[l-1][v] is the cell of v at level l
+        boundary     boundary[l-1][c] lists the boundary nodes of cell c
+        index        index[l-1][v] is the position of v in boundary of its
+                     cell (-1 if v is not a boundary node of level l)
+        clique       clique[l-1][c] is the matrix (row-major) of distances
+                     between the boundary nodes of cell c
+    """
+    def __init__(self, graph, cell_sizes=(64, 1024)):
+        if graph.first is None or graph.edge_u:
+            graph.build_csr()
+        self.graph = graph
+        self.levels = len(cell_sizes)
+        self.cell = []
+        self.boundary = []
+        self.index = []
+        self.clique = None
+        self.preprocess(cell_sizes)
+
+    def neighbours(self, v):
+        """Nodes adjacent to v in either direction."""
+        graph = self.graph
+        for i in range(graph.first[v], graph.first[v+1]):
+            yield graph.head[i]
+        for i in range(graph.firstR[v], graph.firstR[v+1]):
+            yield graph.headR[i]
+
+    def preprocess(self, cell_sizes):
+        """Partition the nodes and find the boundary nodes of every level."""
+        n = self.graph.nodes + 1
+        # Level 1: grow cells of nodes by breadth-first search
+        cell = array('i', [-1])*n
+        count = 0
+        for root in range(n):
+            if cell[root] != -1:
+                continue
+            cell[root] = count
+            size = 1
+            q = deque([root])
+            while q and size < cell_sizes[0]:
+                u = q.popleft()
+                for v in self.neighbours(u):
+                    if cell[v] == -1 and size < cell_sizes[0]:
+                        cell[v] = count
+                        size += 1
+                        q.append(v)
+            count += 1
+        self.cell.append(cell)
+        # Higher levels: grow cells of cells the same way
+        for level in range(1, self.levels):
+            below = self.cell[-1]
+            sizes = [0]*count
+            for v in range(n):
+                sizes[below[v]] += 1
+            adjacent = [set() for _ in range(count)]
+            for v in range(n):
+                for u in self.neighbours(v):
+                    if below[u] != below[v]:
+                        adjacent[below[v]].add(below[u])
+            upper = [-1]*count
+            new_count = 0
+            for root in range(count):
+                if upper[root] != -1:
+                    continue
+                upper[root] = new_count
+                size = sizes[root]
+                q = deque([root])
+                while q:
+                    c = q.popleft()
+                    for d in adjacent[c]:
+                        if upper[d] == -1 and size + sizes[d] <= cell_sizes[level]:
+                            upper[d] = new_count
+                            size += sizes[d]
+                            q.append(d)
+                new_count += 1
+            self.cell.append(array('i', [upper[below[v]] for v in range(n)]))
+            count = new_count
+        # Boundary nodes of every level
+        for cell in self.cell:
+            boundary = [[] for _ in range(max(cell, default=-1) + 1)]
+            index = array('i', [-1])*n
+            for v in range(n):
+                if any(cell[u] != cell[v] for u in self.neighbours(v)):
+                    index[v] = len(boundary[cell[v]])
+                    boundary[cell[v]].append(v)
+            self.boundary.append(boundary)
+            self.index.append(index)
+
+    def customize(self):
+        """Compute the clique weights of every cell from the current weights.
+
+        Returns the time taken in seconds."""
+        begin = time.perf_counter()
+        self.clique = []
+        for level in range(1, self.levels + 1):
+            cell = self.cell[level-1]
+            cliques = []
+            for c, nodes in enumerate(self.boundary[level-1]):
+                k = len(nodes)
+                matrix = array('q', [-1])*(k*k)
+                for i, source in enumerate(nodes):
+                    dist = self.search(source, level - 1, cell, c)
+                    for j, target in enumerate(nodes):
+                        if target in dist:
+                            matrix[i*k+j] = dist[target]
+                cliques.append(matrix)
+            self.clique.append(cliques)
+        return time.perf_counter() - begin
+
+    def arcs(self, u, level, region=None, c=-1):
+        """Return the (v, w) arcs leaving u on the overlay of a level.
+
+        Level 0 is the graph itself. At level l > 0, u must be a boundary
+        node of level l: its arcs are the clique of its cell plus its edges
+        to other cells of level l. If region is given, only arcs to nodes v
+        with region[v] == c are kept."""
+        graph = self.graph
+        first = graph.first
+        head = graph.head
+        weight = graph.weight
+        arcs = []
+        if level == 0:
+            for i in range(first[u], first[u+1]):
+                arcs.append((head[i], weight[i]))
+        else:
+            cell = self.cell[level-1]
+            cu = cell[u]
+            nodes = self.boundary[level-1][cu]
+            k = len(nodes)
+            row = self.index[level-1][u] * k
+            matrix = self.clique[level-1][cu]
+            for j in range(k):
+                w = matrix[row+j]
+                if w != -1:
+                    arcs.append((nodes[j], w))
+            for i in range(first[u], first[u+1]):
+                v = head[i]
+                if cell[v] != cu:
+                    arcs.append((v, weight[i]))
+        if region is not None:
+            arcs = [(v, w) for v, w in arcs if region[v] == c]
+        return arcs
+
+    def search(self, source, level, region, c):
+        """Dijkstra from source on the overlay of one level, restricted to
+        the nodes v with region[v] == c."""
+        dist = {source: 0}
+        heap = [(0, source)]
+        processed = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in processed:
+                continue
+            processed.add(u)
+            for v, w in self.arcs(u, level, region, c):
+                new_dist = d + w
+                if new_dist < dist.get(v, new_dist+1):
+                    dist[v] = new_dist
+                    heapq.heappush(heap, (new_dist, v))
+        return dist
+
+    def query_level(self, u, start, end):
+        """Highest level whose cell of u contains neither start nor end."""
+        for level in range(self.levels, 0, -1):
+            cell = self.cell[level-1]
+            if cell[u] != cell[start] and cell[u] != cell[end]:
+                return level
+        return 0
+
+    def distance(self, start, end):
+        """Compute shortest distance on the overlay (-1 if unreachable)."""
+        if self.clique is None:
+            self.customize()
+        dist = {start: 0}
+        heap = [(0, start)]
+        processed = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u == end:
+                return d
+            if u in processed:
+                continue
+            processed.add(u)
+            level = self.query_level(u, start, end)
+            for v, w in self.arcs(u, level):
+                new_dist = d + w
+                if new_dist < dist.get(v, new_dist+1):
+                    dist[v] = new_dist
+                    heapq.heappush(heap, (new_dist, v))
+        return -1
+
+    def update_weight(self, u, v, w):
+        """Set the weight of every edge u->v to w.
+
+        Takes effect on queries after the next customize()."""
+        graph = self.graph
+        for i in range(graph.first[u], graph.first[u+1]):
+            if graph.head[i] == v:
+                graph.weight[i] = w
+        for i in range(graph.firstR[v], graph.firstR[v+1]):
+            if graph.headR[i] == u:
+                graph.weightR[i] = w
+        graph.max_weight = max(graph.max_weight, w)
+
+
+if __name__ == '__main__':
+    # Input format: same as bidirectional_dijkstra.py
+    # Preprocessing and customization times are written to stderr.
+    n, m = list(map(int, input().split()))
+    graph = Graph(m, n)
+    for i in range(m):
+        (u, v, w) = list(map(int, input().split()))
+        graph.add_edge(u, v, w)
+    begin = time.perf_counter()
+    planner = RoutePlanner(graph)
+    print("preprocessing: %.3f s, customization: %.3f s"
+          % (time.perf_counter() - begin, planner.customize()), file=sys.stderr)
+    q = int(input())
+    results = []
+    for i in range(q):
+        (u, v) = list(map(int, input().split()))
+        results.append(planner.distance(u, v))
+    print(" ".join(list(map(str, results))))
@@ -0,0 +1,162 @@
+#Uses python3
+
+import multiprocessing
+import os
+import random
+import sys
+from array import array
+from bidirectional_dijkstra import Graph
+from dijkstra import distance
+
+# Graph used by the worker processes, set by attach() before any search runs
+shared_graph = None
+
+def attach(graph):
+    """Make graph the one used by relax_requests() in this process."""
+    global shared_graph
+    shared_graph = graph
+
+def relax_requests(task):
+    """Relaxation requests (v, new distance) for the light or heavy edges
+    leaving a chunk of (u, dist[u]) pairs."""
+    chunk, delta, light = task
+    first = shared_graph.first
+    head = shared_graph.head
+    weight = shared_graph.weight
+    requests = []
+    for u, du in chunk:
+        for i in range(first[u], first[u+1]):
+            w = weight[i]
+            if (w <= delta) == light:
+                requests.append((head[i], du + w))
+    return requests
+
+class DeltaStepping:
+    """One-to-all shortest paths with the delta-stepping algorithm.
+
+    Nodes wait in buckets of width delta by tentative distance. The smallest
+    non-empty bucket is emptied by relaxing the light edges (weight <= delta)
+    of its nodes, which may refill it, and then the heavy edges of all nodes
+    removed from it. All nodes of a bucket are relaxed together: when a
+    bucket is large, its nodes are split into chunks that worker processes
+    turn into relaxation requests, which are then applied here. Workers share
+    the graph as in batch_query.py (copy-on-write fork of the CSR arrays).
+
+    Attributes:
+        graph        Graph searched
+        delta        bucket width
+        processes    number of worker processes (1 to run sequentially)
+        chunk_size   smallest number of nodes worth sending to a worker
+    """
+    def __init__(self, graph, delta=None, processes=1, chunk_size=1024):
+        if graph.first is None or graph.edge_u:
+            graph.build_csr()
+        self.graph = graph
+        if delta is None:
+            # The average weight balances re-relaxations and bucket count
+            weight = graph.weight
+            delta = max(1, sum(weight) // max(1, len(weight)))
+        self.delta = delta
+        self.processes = processes or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.pool = None
+        if self.processes > 1:
+            if 'fork' in multiprocessing.get_all_start_methods():
+                attach(graph)
+                context = multiprocessing.get_context('fork')
+                self.pool = context.Pool(self.processes)
+            else:
+                self.pool = multiprocessing.Pool(self.processes, initializer=attach,
+                                                 initargs=(graph,))
+
+    def requests(self, nodes, dist, light):
+        """Relaxation requests of the light or heavy edges of nodes."""
+        chunk = [(u, dist[u]) for u in nodes]
+        size = max(self.chunk_size, -(-len(chunk) // self.processes))
+        if self.pool is None or len(chunk) <= self.chunk_size:
+            attach(self.graph)
+            return relax_requests((chunk, self.delta, light))
+        tasks = [(chunk[i:i+size], self.delta, light)
+                 for i in range(0, len(chunk), size)]
+        requests = []
+        for part in self.pool.map(relax_requests, tasks):
+            requests.extend(part)
+        return requests
+
+    def distances(self, source):
+        """Distances from source to all nodes (-1 if unreachable)."""
+        delta = self.delta
+        n = self.graph.nodes + 1
+        dist = array('q', [-1])*n
+        dist[source] = 0
+        buckets = {0: {source}}
+        def relax(requests):
+            for v, new_dist in requests:
+                old = dist[v]
+                if old == -1 or new_dist < old:
+                    if old != -1 and old // delta in buckets:
+                        buckets[old // delta].discard(v)
+                    dist[v] = new_dist
+                    buckets.setdefault(new_dist // delta, set()).add(v)
+        while buckets:
+            i = min(buckets)
+            removed = []
+            while buckets.get(i):
+                frontier = buckets.pop(i)
+                removed.extend(frontier)
+                relax(self.requests(frontier, dist, True))
+            buckets.pop(i, None)
+            relax(self.requests(removed, dist, False))
+            # Drop buckets emptied by distance decreases
+            for j in [j for j, bucket in buckets.items() if not bucket]:
+                del buckets[j]
+        return dist
+
+    def close(self):
+        """Stop the worker processes."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+if __name__ == '__main__':
+    # Input format
+    # Line 0:     n m
+    # Line 1:     u1 v1 w1
+    # ...
+    # Line m:     um vm wm
+    # Line m+1:   k
+    # Line m+2:   s1 s2 ... sk
+    # 1 <= s,u,v <= n  :  nodes in 1-based indices
+    # k  :  number of sources
+    # Output: one line per source with the distances to nodes 1..n
+    # Usage: python3 delta_stepping.py [processes] [--check] < input
+    #     --check compares distances to 100 random targets per source with
+    #     dijkstra.py
+    args = [arg for arg in sys.argv[1:] if arg != '--check']
+    processes = int(args[0]) if args else 1
+    data = list(map(int, sys.stdin.read().split()))
+    n, m = data[0:2]
+    graph = Graph(m, n)
+    adj = [[] for _ in range(n+1)]
+    cost = [[] for _ in range(n+1)]
+    for i in range(m):
+        u, v, w = data[2+3*i:5+3*i]
+        graph.add_edge(u, v, w)
+        adj[u].append(v)
+        cost[u].append(w)
+    k = data[2+3*m]
+    sources = data[3+3*m:3+3*m+k]
+    with DeltaStepping(graph, processes=processes) as engine:
+        for s in sources:
+            dist = engine.distances(s)
+            if '--check' in sys.argv:
+                for t in random.sample(range(1, n+1), min(n, 100)):
+                    assert dist[t] == distance(adj, cost, s, t), (s, t)
+            print(" ".join(map(str, dist[1:])))
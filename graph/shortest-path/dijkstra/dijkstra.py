@@ -1,26 +1,126 @@
 #Uses python3
 
 import sys
-import heapq
+from priority_queues import HeapQueue, logged_pop
 
-def distance(adj, cost, s, t):
+def components(adj):
+    """Connectivity index of a graph given as adjacency lists.
+
+    Returns (component, weak): strongly connected components numbered in
+    topological order of the condensation DAG (Kosaraju's algorithm), and
+    weakly connected components. t is unreachable from s if
+    component[s] > component[t] or weak[s] != weak[t]."""
+    n = len(adj)
+    adjR = [[] for _ in range(n)]
+    for u, edges in enumerate(adj):
+        for v in edges:
+            adjR[v].append(u)
+    # First pass: order nodes by finishing time of a DFS on the graph
+    order = []
+    visited = [False]*n
+    for root in range(n):
+        if visited[root]:
+            continue
+        visited[root] = True
+        stack = [(root, 0)]
+        while stack:
+            u, i = stack[-1]
+            if i < len(adj[u]):
+                stack[-1] = (u, i+1)
+                v = adj[u][i]
+                if not visited[v]:
+                    visited[v] = True
+                    stack.append((v, 0))
+            else:
+                stack.pop()
+                order.append(u)
+    # Second pass: DFS on the reverse graph by decreasing finishing time
+    component = [-1]*n
+    count = 0
+    for root in reversed(order):
+        if component[root] != -1:
+            continue
+        component[root] = count
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in adjR[u]:
+                if component[v] == -1:
+                    component[v] = count
+                    stack.append(v)
+        count += 1
+    # Weak components: search both directions
+    weak = [-1]*n
+    count = 0
+    for root in range(n):
+        if weak[root] != -1:
+            continue
+        weak[root] = count
+        stack = [root]
+        while stack:
+            u = stack.pop()
+            for v in adj[u] + adjR[u]:
+                if weak[v] == -1:
+                    weak[v] = count
+                    stack.append(v)
+        count += 1
+    return component, weak
+
+def distance(adj, cost, s, t, queue=None, index=None, stats=None):
+    """Shortest distance from s to t (-1 if unreachable).
+
+    queue is an empty priority queue from priority_queues.py (HeapQueue
+    if None). index is the result of components(adj): if given, queries
+    with no path are rejected before any search and nodes that cannot
+    reach t are not explored. stats is a collector of search statistics
+    (see search_stats.py) that receives the counters of this query."""
+    if index is not None:
+        component, weak = index
+        if weak[s] != weak[t] or component[s] > component[t]:
+            if stats is not None:
+                stats.record(0, 0, 0, 0)
+            return -1
+        high = component[t]
     n = len(adj)
     dist = [-1]*n
     dist[s] = 0
-    h = []
-    heapq.heappush(h,(0,s))
+    h = HeapQueue() if queue is None else queue
+    push = h.push
+    pop = h.pop
+    push((0,s))
+    if stats is not None:
+        # Popped nodes are logged and counted after the search, so that
+        # the loop keeps no counters when statistics are disabled
+        popped = []
+        pop = logged_pop(pop, popped.append)
+    result = -1
     while h:
-        min_v = heapq.heappop(h)[1]
+        d, min_v = pop()
+        if d > dist[min_v]:
+            # Stale entry of a node whose key was decreased
+            continue
         if min_v == t:
-            return dist[t]
+            result = dist[t]
+            break
         for i, v in enumerate(adj[min_v]):
+            if index is not None and component[v] > high:
+                continue
             if dist[v] == -1:
                 dist[v] = dist[min_v] + cost[min_v][i]
-                heapq.heappush(h,(dist[v],v))
+                push((dist[v],v))
             elif dist[v] > dist[min_v] + cost[min_v][i]:
                 dist[v] = dist[min_v] + cost[min_v][i]
-                heapq.heappush(h,(dist[v],v))
-    return -1
+                push((dist[v],v))
+    if stats is not None:
+        # The first pop of a node settles it, any later pop is stale; the
+        # edges of t are not scanned
+        nodes = set(popped)
+        relaxed = sum(len(adj[u]) for u in nodes)
+        if result != -1:
+            relaxed -= len(adj[t])
+        stats.record(len(nodes), len(popped) + len(h), len(popped) - len(nodes),
+                     relaxed)
+    return result
 
 if __name__ == '__main__':
     input = sys.stdin.read()
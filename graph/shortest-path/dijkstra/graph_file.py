@@ -0,0 +1,171 @@
+#Uses python3
+
+import mmap
+import struct
+import sys
+from array import array
+from math import isnan
+from bidirectional_dijkstra import Graph
+
+# File layout (native byte order, every section starts at a multiple of 8):
+#     header      MAGIC, version, byte order mark, flags, nodes, edges,
+#                 max_weight (HEADER, 64 bytes)
+#     first       int64[nodes+2]   CSR offsets of graph
+#     head        int32[edges]     CSR targets of graph
+#     weight      int64[edges]     CSR weights of graph
+#     firstR      int64[nodes+2]   CSR offsets of reverse graph
+#     headR       int32[edges]     CSR targets of reverse graph
+#     weightR     int64[edges]     CSR weights of reverse graph
+#     x, y        float64[nodes+1] coordinates (only if FLAG_COOR is set)
+#     component   int32[nodes+1]   strongly connected components
+#     weak        int32[nodes+1]   weakly connected components (both only if
+#                                  FLAG_COMPONENTS is set)
+MAGIC = b'SPGRAPH\0'
+VERSION = 1
+BYTE_ORDER_MARK = 0x01020304
+FLAG_COOR = 1
+FLAG_COMPONENTS = 2
+HEADER = struct.Struct('=8sIIIqqq')
+HEADER_SIZE = 64
+
+class CoordinateView:
+    """Read-only coor sequence of (x, y) tuples over two coordinate arrays
+    (None for nodes without coordinates, stored as NaN)."""
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, v):
+        x = self.x[v]
+        return None if isnan(x) else (x, self.y[v])
+
+def sections(nodes, edges, flags):
+    """Return the (name, typecode, length) of every section in file order."""
+    layout = [('first', 'q', nodes+2), ('head', 'i', edges), ('weight', 'q', edges),
+              ('firstR', 'q', nodes+2), ('headR', 'i', edges), ('weightR', 'q', edges)]
+    if flags & FLAG_COOR:
+        layout += [('x', 'd', nodes+1), ('y', 'd', nodes+1)]
+    if flags & FLAG_COMPONENTS:
+        layout += [('component', 'i', nodes+1), ('weak', 'i', nodes+1)]
+    return layout
+
+def write_graph(path, graph):
+    """Write graph (and its coordinates if it has any) to a binary file."""
+    if graph.first is None or graph.edge_u:
+        graph.build_csr()
+    nodes = graph.nodes
+    edges = len(graph.head)
+    # The Graph of bidirectional_coor_astar.py keeps its coordinates in x
+    # and y, with NaN for nodes that have none
+    x = getattr(graph, 'x', None)
+    y = getattr(graph, 'y', None)
+    if x is None:
+        coor = getattr(graph, 'coor', None)
+        if coor is not None:
+            nan = float('nan')
+            x = array('d', [nan if c is None else c[0] for c in coor])
+            y = array('d', [nan if c is None else c[1] for c in coor])
+    has_coor = x is not None and any(c == c for c in x)
+    data = {'first': graph.first, 'head': graph.head, 'weight': graph.weight,
+            'firstR': graph.firstR, 'headR': graph.headR, 'weightR': graph.weightR}
+    flags = 0
+    # The Graph of bidirectional_coor_astar.py has no connectivity index
+    if hasattr(graph, 'build_components'):
+        if graph.component is None:
+            graph.build_components()
+        flags |= FLAG_COMPONENTS
+        data['component'] = graph.component
+        data['weak'] = graph.weak
+    if has_coor:
+        flags |= FLAG_COOR
+        data['x'] = x
+        data['y'] = y
+    with open(path, 'wb') as f:
+        header = HEADER.pack(MAGIC, VERSION, BYTE_ORDER_MARK, flags, nodes,
+                             edges, graph.max_weight)
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        for name, typecode, length in sections(nodes, edges, flags):
+            section = data[name]
+            if not isinstance(section, array) or section.typecode != typecode:
+                section = array(typecode, section)
+            raw = section.tobytes()
+            f.write(raw)
+            f.write(b'\0' * (-len(raw) % 8))
+
+def load_graph(path, graph_class=Graph):
+    """Map a binary graph file into memory and return a graph on top of it.
+
+    Only the header is read: the CSR arrays are memoryviews of the mapping,
+    so their pages are read from disk on demand by the first queries.
+    graph_class may be any class with the attributes of Graph, e.g. the
+    Graph of bidirectional_coor_astar.py."""
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    magic, version, mark, flags, nodes, edges, max_weight = \
+        HEADER.unpack_from(view)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("%s is not a graph file" % path)
+    if mark != BYTE_ORDER_MARK:
+        raise ValueError("%s was written with a different byte order" % path)
+    data = {}
+    offset = HEADER_SIZE
+    for name, typecode, length in sections(nodes, edges, flags):
+        size = length * array(typecode).itemsize
+        data[name] = view[offset:offset+size].cast(typecode)
+        offset += size + (-size % 8)
+    graph = graph_class(edges, nodes)
+    graph.first = data['first']
+    graph.head = data['head']
+    graph.weight = data['weight']
+    graph.firstR = data['firstR']
+    graph.headR = data['headR']
+    graph.weightR = data['weightR']
+    graph.max_weight = max_weight
+    if flags & FLAG_COOR:
+        graph.coor = CoordinateView(data['x'], data['y'])
+    if flags & FLAG_COMPONENTS:
+        graph.component = data['component']
+        graph.weak = data['weak']
+    # Keep the mapping alive for as long as the graph
+    graph.mapping = mapping
+    return graph
+
+
+if __name__ == '__main__':
+    # Usage:
+    #     python3 graph_file.py write graph.bin < input
+    #         input in the format of bidirectional_dijkstra.py without the
+    #         queries, or with --coor in that of bidirectional_coor_astar.py
+    #     python3 graph_file.py query graph.bin < queries
+    #         queries in the format of bidirectional_dijkstra.py (q, then
+    #         one "s t" per line)
+    command, path = sys.argv[1:3]
+    if command == 'write':
+        data = sys.stdin.read().split()
+        n, m = int(data[0]), int(data[1])
+        data = data[2:]
+        graph = Graph(m, n)
+        if '--coor' in sys.argv:
+            # Decimal coordinates, as read by bidirectional_coor_astar.py
+            coor = list(map(float, data[0:2*n]))
+            graph.coor = [None] + list(zip(coor[0::2], coor[1::2]))
+            data = data[2*n:]
+        data = list(map(int, data))
+        for i in range(m):
+            graph.add_edge(data[3*i], data[3*i+1], data[3*i+2])
+        write_graph(path, graph)
+    elif command == 'query':
+        graph = load_graph(path)
+        q = int(input())
+        results = []
+        for i in range(q):
+            (u, v) = list(map(int, input().split()))
+            dist = graph.distance(u, v)
+            if dist == float('inf'):
+                dist = -1
+            results.append(dist)
+        print(" ".join(list(map(str, results))))
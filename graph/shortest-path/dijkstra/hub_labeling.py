@@ -0,0 +1,204 @@
+#Uses python3
+
+import heapq
+import struct
+import sys
+from array import array
+from bidirectional_dijkstra import Graph
+from contraction_hierarchies import ContractionHierarchy
+
+class HubLabels:
+    """Hub labeling (2-hop cover) distance oracle.
+
+    Every node v gets an out-label of hubs h with d(v, h) and an in-label of
+    hubs h with d(h, v), such that some shortest path from s to t passes
+    through a hub in both the out-label of s and the in-label of t. The
+    labels are built by pruned landmark labeling: one pruned Dijkstra search
+    in each direction from every node, in rank order, skipping nodes whose
+    distance is already covered by the labels built so far. Label sizes
+    depend heavily on the order; by default nodes are ranked by the reverse
+    contraction order of a ContractionHierarchy, which ranks the nodes that
+    cover many shortest paths first.
+
+    Labels are stored in flat arrays sorted by hub rank: the out-label of v
+    is out_hub[out_first[v]:out_first[v+1]] with distances in out_dist (and
+    likewise for the in-labels), so a query is a merge-join of two arrays.
+
+    Attributes:
+        nodes        number of nodes
+        rank         rank of each node (0 is the most important hub)
+        out_first    offsets of out-labels
+        out_hub      hub ranks of out-labels
+        out_dist     distances from node to hub
+        in_first     offsets of in-labels
+        in_hub       hub ranks of in-labels
+        in_dist      distances from hub to node
+    """
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.rank = None
+        self.out_first = None
+        self.out_hub = None
+        self.out_dist = None
+        self.in_first = None
+        self.in_hub = None
+        self.in_dist = None
+
+    @classmethod
+    def build(cls, graph, order=None):
+        """Build the labels of a Graph, ranking nodes in the given order."""
+        if graph.first is None or graph.edge_u:
+            graph.build_csr()
+        labels = cls(graph.nodes)
+        n = graph.nodes + 1
+        if order is None:
+            ch_rank = ContractionHierarchy(graph).rank
+            order = sorted(range(n), key=ch_rank.__getitem__, reverse=True)
+        rank = array('i', [0])*n
+        for r, v in enumerate(order):
+            rank[v] = r
+        out_labels = [([], []) for _ in range(n)]
+        in_labels = [([], []) for _ in range(n)]
+        # hub_dist[r] is the distance between the current root and hub r
+        inf = float('inf')
+        hub_dist = [inf]*n
+        for r, root in enumerate(order):
+            # Forward search fills in-labels: d(root, v)
+            hubs, dists = out_labels[root]
+            for h, d in zip(hubs, dists):
+                hub_dist[h] = d
+            cls.pruned_search(graph.first, graph.head, graph.weight, root, r,
+                              hub_dist, in_labels)
+            for h in hubs:
+                hub_dist[h] = inf
+            # Backward search fills out-labels: d(v, root)
+            hubs, dists = in_labels[root]
+            for h, d in zip(hubs, dists):
+                hub_dist[h] = d
+            cls.pruned_search(graph.firstR, graph.headR, graph.weightR, root, r,
+                              hub_dist, out_labels)
+            for h in hubs:
+                hub_dist[h] = inf
+        labels.rank = rank
+        labels.out_first, labels.out_hub, labels.out_dist = cls.flatten(out_labels)
+        labels.in_first, labels.in_hub, labels.in_dist = cls.flatten(in_labels)
+        return labels
+
+    @staticmethod
+    def pruned_search(first, head, weight, root, r, hub_dist, labels):
+        """Dijkstra from root that adds hub r to the labels of the nodes it
+        settles, except those already covered by a shorter or equal path."""
+        dist = {root: 0}
+        heap = [(0, root)]
+        processed = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in processed:
+                continue
+            processed.add(u)
+            hubs, dists = labels[u]
+            covered = False
+            for h, dh in zip(hubs, dists):
+                if hub_dist[h] + dh <= d:
+                    covered = True
+                    break
+            if covered:
+                continue
+            hubs.append(r)
+            dists.append(d)
+            for i in range(first[u], first[u+1]):
+                v = head[i]
+                new_dist = d + weight[i]
+                if new_dist < dist.get(v, new_dist+1):
+                    dist[v] = new_dist
+                    heapq.heappush(heap, (new_dist, v))
+
+    @staticmethod
+    def flatten(labels):
+        """Pack per-node labels into offset, hub and distance arrays."""
+        first = array('q', [0])
+        hub = array('i')
+        dist = array('q')
+        for hubs, dists in labels:
+            hub.extend(hubs)
+            dist.extend(dists)
+            first.append(len(hub))
+        return first, hub, dist
+
+    def distance(self, start, end):
+        """Shortest distance from start to end (-1 if unreachable)."""
+        out_hub = self.out_hub
+        out_dist = self.out_dist
+        in_hub = self.in_hub
+        in_dist = self.in_dist
+        i = self.out_first[start]
+        i_end = self.out_first[start+1]
+        j = self.in_first[end]
+        j_end = self.in_first[end+1]
+        shortest = -1
+        while i < i_end and j < j_end:
+            hi = out_hub[i]
+            hj = in_hub[j]
+            if hi < hj:
+                i += 1
+            elif hi > hj:
+                j += 1
+            else:
+                length = out_dist[i] + in_dist[j]
+                if shortest == -1 or length < shortest:
+                    shortest = length
+                i += 1
+                j += 1
+        return shortest
+
+    def label_size(self):
+        """Average number of hubs per label."""
+        return (len(self.out_hub) + len(self.in_hub)) / (2 * (self.nodes + 1))
+
+    # File layout: nodes, len(out_hub), len(in_hub) (HEADER), then rank,
+    # out_first, out_hub, out_dist, in_first, in_hub, in_dist
+    HEADER = struct.Struct('=qqq')
+
+    def save(self, path):
+        """Write the labels to a binary file."""
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.nodes, len(self.out_hub), len(self.in_hub)))
+            for data in (self.rank, self.out_first, self.out_hub, self.out_dist,
+                         self.in_first, self.in_hub, self.in_dist):
+                data.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        """Read labels written by save()."""
+        with open(path, 'rb') as f:
+            nodes, out_size, in_size = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            labels = cls(nodes)
+            n = nodes + 1
+            arrays = []
+            for typecode, length in (('i', n), ('q', n+1), ('i', out_size),
+                                     ('q', out_size), ('q', n+1), ('i', in_size),
+                                     ('q', in_size)):
+                data = array(typecode)
+                data.fromfile(f, length)
+                arrays.append(data)
+        (labels.rank, labels.out_first, labels.out_hub, labels.out_dist,
+         labels.in_first, labels.in_hub, labels.in_dist) = arrays
+        return labels
+
+
+if __name__ == '__main__':
+    # Input format: same as bidirectional_dijkstra.py
+    # Average label size is written to stderr.
+    n, m = list(map(int, input().split()))
+    graph = Graph(m, n)
+    for i in range(m):
+        (u, v, w) = list(map(int, input().split()))
+        graph.add_edge(u, v, w)
+    labels = HubLabels.build(graph)
+    print("average label size: %.1f" % labels.label_size(), file=sys.stderr)
+    q = int(input())
+    results = []
+    for i in range(q):
+        (u, v) = list(map(int, input().split()))
+        results.append(labels.distance(u, v))
+    print(" ".join(list(map(str, results))))
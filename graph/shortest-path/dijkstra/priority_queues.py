@@ -0,0 +1,210 @@
+#Uses python3
+
+import heapq
+from array import array
+from functools import partial
+
+# All queues share the same interface, so that the Dijkstra implementations
+# can take any of them:
+#     Queue(n, max_weight)  n: number of nodes, max_weight: largest edge weight
+#     push((key, node))     insert node (or lower its key)
+#     pop()                 remove and return (key, node) with the smallest key
+#     len(queue)            number of entries
+#     clear()               remove all entries
+# Except for HeapQueue and IndexedDaryHeap, the queues are monotone: they
+# require integer keys and that no key smaller than the last popped one is
+# pushed, which holds for Dijkstra's algorithm with non-negative weights.
+
+def logged_pop(pop, log):
+    """Wrap the pop function of a queue to also log the popped nodes."""
+    def logged():
+        item = pop()
+        log(item[1])
+        return item
+    return logged
+
+class HeapQueue(list):
+    """Binary heap from heapq with lazy deletion.
+
+    A node whose key decreases is pushed again and the stale entries are
+    skipped by the caller. push and pop are bound directly to the C
+    functions of heapq, so this is as fast as using heapq on a list."""
+    def __init__(self, n=None, max_weight=None):
+        super().__init__()
+        self.push = partial(heapq.heappush, self)
+        self.pop = partial(heapq.heappop, self)
+
+class RadixHeap:
+    """Radix heap for integer keys (monotone).
+
+    Entries are stored in bucket i when their key differs from the last
+    popped key in bit i-1 at the highest. Popping from an empty bucket 0
+    redistributes the first non-empty bucket into lower buckets, so each
+    entry moves O(log C) times in total."""
+    def __init__(self, n=None, max_weight=None):
+        self.buckets = [[] for _ in range(65)]
+        self.last = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, entry):
+        """Insert a (key, node) entry."""
+        self.buckets[(entry[0] ^ self.last).bit_length()].append(entry)
+        self.size += 1
+
+    def pop(self):
+        """Remove and return the entry with the smallest key."""
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            bucket = buckets[i]
+            last = min(bucket)[0]
+            self.last = last
+            # All entries move to buckets lower than i
+            for entry in bucket:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+            bucket.clear()
+        self.size -= 1
+        return buckets[0].pop()
+
+    def clear(self):
+        """Remove all entries."""
+        for bucket in self.buckets:
+            bucket.clear()
+        self.last = 0
+        self.size = 0
+
+class BucketQueue:
+    """Dial's bucket queue for integer keys (monotone).
+
+    Keys in the queue always lie between the last popped key and that key
+    plus the largest edge weight C, so C+1 buckets used cyclically are
+    enough. Best suited to small weight ranges."""
+    def __init__(self, n=None, max_weight=1):
+        self.count = max_weight + 1
+        self.buckets = [[] for _ in range(self.count)]
+        self.current = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, entry):
+        """Insert a (key, node) entry."""
+        self.buckets[entry[0] % self.count].append(entry)
+        self.size += 1
+
+    def pop(self):
+        """Remove and return the entry with the smallest key."""
+        buckets = self.buckets
+        count = self.count
+        i = self.current
+        while not buckets[i % count]:
+            i += 1
+        self.current = i
+        self.size -= 1
+        return buckets[i % count].pop()
+
+    def clear(self):
+        """Remove all entries."""
+        for bucket in self.buckets:
+            bucket.clear()
+        self.current = 0
+        self.size = 0
+
+class IndexedDaryHeap:
+    """d-ary heap indexed by node, with decrease-key.
+
+    Each node is in the heap at most once (pos[node] is its index, -1 if
+    absent), so pushing a node that is already there only lowers its key
+    and no stale entries are ever popped."""
+    def __init__(self, n, max_weight=None, d=4):
+        self.d = d
+        self.keys = []
+        self.nodes = []
+        self.pos = array('i', [-1])*n
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def push(self, entry):
+        """Insert node with key, or decrease its key."""
+        key, node = entry
+        keys = self.keys
+        nodes = self.nodes
+        pos = self.pos
+        i = pos[node]
+        if i == -1:
+            keys.append(key)
+            nodes.append(node)
+            i = len(nodes) - 1
+        elif key >= keys[i]:
+            return
+        # Sift up: move parents down until the hole fits key
+        d = self.d
+        while i > 0:
+            parent = (i - 1) // d
+            if keys[parent] <= key:
+                break
+            keys[i] = keys[parent]
+            nodes[i] = nodes[parent]
+            pos[nodes[i]] = i
+            i = parent
+        keys[i] = key
+        nodes[i] = node
+        pos[node] = i
+
+    def pop(self):
+        """Remove and return the (key, node) with the smallest key."""
+        keys = self.keys
+        nodes = self.nodes
+        pos = self.pos
+        key = keys[0]
+        node = nodes[0]
+        pos[node] = -1
+        last_key = keys.pop()
+        last_node = nodes.pop()
+        size = len(nodes)
+        if size:
+            # Sift down: move the smallest child up until the hole fits
+            d = self.d
+            i = 0
+            while True:
+                child = d*i + 1
+                if child >= size:
+                    break
+                best = child
+                best_key = keys[child]
+                for c in range(child + 1, min(child + d, size)):
+                    if keys[c] < best_key:
+                        best = c
+                        best_key = keys[c]
+                if best_key >= last_key:
+                    break
+                keys[i] = best_key
+                nodes[i] = nodes[best]
+                pos[nodes[i]] = i
+                i = best
+            keys[i] = last_key
+            nodes[i] = last_node
+            pos[last_node] = i
+        return key, node
+
+    def clear(self):
+        """Remove all entries."""
+        pos = self.pos
+        for node in self.nodes:
+            pos[node] = -1
+        self.keys.clear()
+        self.nodes.clear()
+
+QUEUES = {
+    'heap': HeapQueue,
+    'radix': RadixHeap,
+    'dial': BucketQueue,
+    'dary': IndexedDaryHeap,
+}
@@ -0,0 +1,162 @@
+#Uses python3
+
+import heapq
+import sys
+from collections import OrderedDict
+from bidirectional_dijkstra import Graph
+
+class ForwardSearch:
+    """Dijkstra search from one source that can be resumed for new targets.
+
+    Only the explored part of the graph is stored: tentative distances in a
+    dict, the settled nodes in a set and the heap as is. A target already
+    settled is answered from dist; otherwise the search continues until the
+    target is settled or the heap runs empty (then every node reachable from
+    the source is settled).
+
+    Attributes:
+        source       source of the search
+        dist         tentative (final if settled) distance of every seen node
+        settled      nodes whose distance is final
+        heap         (distance, node) entries still to be popped
+    """
+    # Rough sizes in bytes of a dict entry, a set entry and a heap entry
+    # (list slot plus a (distance, node) tuple), for memory accounting
+    DIST_ENTRY = 100
+    SETTLED_ENTRY = 60
+    HEAP_ENTRY = 72
+
+    def __init__(self, source):
+        self.source = source
+        self.dist = {source: 0}
+        self.settled = set()
+        self.heap = [(0, source)]
+
+    def size(self):
+        """Approximate memory used by the search in bytes."""
+        return (len(self.dist) * self.DIST_ENTRY
+                + len(self.settled) * self.SETTLED_ENTRY
+                + len(self.heap) * self.HEAP_ENTRY)
+
+    def resume(self, graph, target):
+        """Distance from source to target (-1 if unreachable), expanding the
+        search only as far as needed."""
+        dist = self.dist
+        settled = self.settled
+        if target in settled:
+            if graph.stats is not None:
+                graph.stats.record(0, 0, 0, 0, None)
+            return dist[target]
+        first = graph.first
+        head = graph.head
+        weight = graph.weight
+        heap = self.heap
+        heappop = heapq.heappop
+        heappush = heapq.heappush
+        # Counters for graph.stats, kept per pop: nodes settled by earlier
+        # queries can be popped again, so they are not derived afterwards
+        settled_count = 0
+        stale = 0
+        relaxed = 0
+        pushes = 0
+        result = -1
+        while heap:
+            d, u = heappop(heap)
+            if u in settled:
+                stale += 1
+                continue
+            settled.add(u)
+            settled_count += 1
+            relaxed += first[u+1] - first[u]
+            for i in range(first[u], first[u+1]):
+                v = head[i]
+                new_dist = d + weight[i]
+                if new_dist < dist.get(v, new_dist+1):
+                    dist[v] = new_dist
+                    heappush(heap, (new_dist, v))
+                    pushes += 1
+            if u == target:
+                result = d
+                break
+        if graph.stats is not None:
+            graph.stats.record(settled_count, pushes, stale, relaxed, None)
+        return result
+
+class SearchCache:
+    """Distance queries that reuse the forward search of their source.
+
+    Queries from the same source (e.g. one depot and many stops) resume the
+    same ForwardSearch, so a batch of queries from one source costs about one
+    Dijkstra search in total. Searches are kept in least recently used order
+    and the oldest are dropped whenever their total estimated size exceeds
+    max_bytes.
+
+    Attributes:
+        graph        Graph searched
+        max_bytes    memory budget of the cached searches
+        searches     ForwardSearch of each cached source, oldest first
+        used         estimated size of all cached searches in bytes
+        hits         queries answered by a cached search
+        misses       queries that started a new search
+    """
+    def __init__(self, graph, max_bytes=64*2**20):
+        if graph.first is None or graph.edge_u:
+            graph.build_csr()
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.searches = OrderedDict()
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+
+    def distance(self, start, end):
+        """Shortest distance from start to end (-1 if unreachable)."""
+        graph = self.graph
+        if graph.component is None:
+            graph.build_components()
+        if not graph.reachable(start, end):
+            # No need to expand (or even create) the search of start
+            if graph.stats is not None:
+                graph.stats.record(0, 0, 0, 0, None)
+            return -1
+        search = self.searches.get(start)
+        if search is None:
+            self.misses += 1
+            search = ForwardSearch(start)
+            self.searches[start] = search
+            before = 0
+        else:
+            self.hits += 1
+            self.searches.move_to_end(start)
+            before = search.size()
+        result = search.resume(graph, end)
+        self.used += search.size() - before
+        while self.used > self.max_bytes and self.searches:
+            _, oldest = self.searches.popitem(last=False)
+            self.used -= oldest.size()
+        return result
+
+    def clear(self):
+        """Drop all cached searches (e.g. after the weights changed)."""
+        self.searches.clear()
+        self.used = 0
+
+
+if __name__ == '__main__':
+    # Input format: same as bidirectional_dijkstra.py
+    # Usage: python3 search_cache.py [max_bytes] < input
+    # Cache hits and misses are written to stderr.
+    max_bytes = int(sys.argv[1]) if len(sys.argv) > 1 else 64*2**20
+    n, m = list(map(int, input().split()))
+    graph = Graph(m, n)
+    for i in range(m):
+        (u, v, w) = list(map(int, input().split()))
+        graph.add_edge(u, v, w)
+    cache = SearchCache(graph, max_bytes)
+    q = int(input())
+    results = []
+    for i in range(q):
+        (u, v) = list(map(int, input().split()))
+        results.append(cache.distance(u, v))
+    print(" ".join(list(map(str, results))))
+    print("hits: %d, misses: %d" % (cache.hits, cache.misses), file=sys.stderr)
@@ -0,0 +1,86 @@
+#Uses python3
+
+from array import array
+
+class SearchStats:
+    """Statistics reported by shortest-path queries.
+
+    Attach an instance to dijkstra.distance (stats argument) or to
+    Graph.stats of bidirectional_dijkstra.py or bidirectional_coor_astar.py.
+    Each query then calls record() once, and the counters of a batch of
+    queries can be summarised or turned into histograms. Without a collector
+    nothing is recorded.
+
+    Attributes:
+        settled      nodes settled (removed from a queue for the first time)
+        pushes       entries pushed into the queues
+        stale        entries popped for nodes already settled
+        relaxed      edges scanned from settled nodes
+        meeting      node where the forward and backward parts of the best
+                     path meet: the node settled by one search that the
+                     other reached across the edge joining them, as in both
+                     bidirectional_dijkstra.py and bidirectional_coor_astar.py
+                     (None for unidirectional or failed searches)
+    """
+    FIELDS = ('settled', 'pushes', 'stale', 'relaxed')
+
+    def __init__(self):
+        self.settled = array('q')
+        self.pushes = array('q')
+        self.stale = array('q')
+        self.relaxed = array('q')
+        self.meeting = []
+
+    def __len__(self):
+        return len(self.settled)
+
+    def record(self, settled, pushes, stale, relaxed, meeting=None):
+        """Record the counters of one query."""
+        self.settled.append(settled)
+        self.pushes.append(pushes)
+        self.stale.append(stale)
+        self.relaxed.append(relaxed)
+        self.meeting.append(meeting)
+
+    def clear(self):
+        """Forget all recorded queries (e.g. at the start of a batch)."""
+        for field in self.FIELDS:
+            del getattr(self, field)[:]
+        self.meeting.clear()
+
+    def histogram(self, field):
+        """Histogram of a counter with power-of-two buckets.
+
+        Returns a sorted list of (lower bound, count): bucket b holds the
+        values in [b, 2b), and bucket 0 holds the zeros."""
+        counts = {}
+        for value in getattr(self, field):
+            bucket = 1 << (value.bit_length() - 1) if value else 0
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return sorted(counts.items())
+
+    def summary(self):
+        """Mean, median, 99th percentile and maximum of every counter."""
+        result = {}
+        for field in self.FIELDS:
+            values = sorted(getattr(self, field))
+            if not values:
+                continue
+            result[field] = {
+                'mean': sum(values) / len(values),
+                'p50': values[(len(values) - 1) // 2],
+                'p99': values[(len(values) - 1) * 99 // 100],
+                'max': values[-1],
+            }
+        return result
+
+    def report(self):
+        """Summary and histograms as text."""
+        lines = ["%d queries" % len(self)]
+        for field, values in self.summary().items():
+            lines.append("%-8s mean %.1f  p50 %d  p99 %d  max %d"
+                         % (field, values['mean'], values['p50'], values['p99'],
+                            values['max']))
+            lines.append("         " + "  ".join("%d+: %d" % bucket for bucket
+                                                 in self.histogram(field)))
+        return "\n".join(lines)